@@ -1,53 +1,215 @@
+import io
 import json
-from typing import Dict, Set, List
+import os
+import pickle
+import sys
+from typing import Dict, Set, List, Tuple, Optional, Iterable
 from pathlib import Path
+from bisect import bisect_left
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+try:
+    from pyroaring import BitMap
+    HAS_ROARING = True
+except ImportError:
+    HAS_ROARING = False
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+try:
+    import msgpack
+    HAS_MSGPACK = True
+except ImportError:
+    HAS_MSGPACK = False
+
+
+# Roaring bitmaps compress dense postings and run AND/OR/NOT in C; both types
+# share the set operators, so the rest of the code does not care which it gets
+Posting = BitMap if HAS_ROARING else set
+
+# Index file format by suffix; anything else is saved as npz
+INDEX_FORMATS = {'.json': 'json', '.mpk': 'msgpack', '.npz': 'npz'}
+
+# Below this many files the pool start-up costs more than it saves
+PARALLEL_MIN_DOCUMENTS = 1000
+
+_worker_tokenizer = None
+_worker_stemmer = None
+
+
+def _init_worker(tokenizer, stemmer):
+    global _worker_tokenizer, _worker_stemmer
+    _worker_tokenizer = tokenizer
+    _worker_stemmer = stemmer
+
+
+def _process_document(text_file: Path, tokenizer, stemmer) -> Optional[Tuple[int, Iterable[str], Dict]]:
+    try:
+        doc_id_str = text_file.stem.split('_')[1]
+        doc_id = int(doc_id_str)
+
+        content = text_file.read_text(encoding='utf-8')
+
+        if 'CONTENT:' in content:
+            content = content.split('CONTENT:', 2)[1].strip()
+
+        # Lazy: tokens are stemmed and deduped as the index consumes them
+        tokens = tokenizer.iter_tokens(content)
+
+        if stemmer:
+            tokens = stemmer.iter_stems(tokens)
+
+        metadata = {}
+        if 'TITLE:' in content:
+            title_line = [line for line in content.split('\n') if line.startswith('TITLE:')]
+            if title_line:
+                metadata['title'] = title_line[0].replace('TITLE:', '').strip()
+
+        return doc_id, tokens, metadata
+    except Exception:
+        return None
+
+
+def _process_document_worker(text_file: Path) -> Optional[Tuple[int, List[str], Dict]]:
+    result = _process_document(text_file, _worker_tokenizer, _worker_stemmer)
+    if result is None:
+        return None
+    
+    # The index only needs each term once; dedupe before pickling back
+    doc_id, tokens, metadata = result
+    try:
+        return doc_id, list(dict.fromkeys(tokens)), metadata
+    except Exception:
+        return None
 
 
 class BooleanIndex:
 
     def __init__(self):
-        self.index: Dict[str, Set[int]] = defaultdict(set)
+        self.index: Dict[str, Posting] = defaultdict(Posting)
 
         self.documents: Dict[int, Dict] = {}
 
+        self.max_doc_id = 0
+        self._bitsets: Dict[str, np.ndarray] = {}
+        self._reset_finalized()
+
         self.stats = {
             'total_documents': 0,
             'total_terms': 0,
             'index_size': 0
         }
     
+    def _reset_finalized(self):
+        # Read-only CSR view of the index: sorted terms, their concatenated
+        # sorted doc ids, and offsets so term i owns data[offs[i]:offs[i + 1]]
+        self._terms: List[str] = None
+        self._posting_data = np.empty(0, dtype=np.uint32)
+        self._posting_offs = np.zeros(1, dtype=np.int64)
+    
+    def _finalize(self):
+        if self._terms is not None:
+            return
+
+        terms = sorted(self.index)
+        postings = [self.index[term] for term in terms]
+        offs = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum([len(posting) for posting in postings], out=offs[1:])
+
+        data = np.empty(offs[-1], dtype=np.uint32)
+        for i, posting in enumerate(postings):
+            segment = data[offs[i]:offs[i + 1]]
+            segment[:] = np.fromiter(posting, dtype=np.uint32, count=len(posting))
+            if not HAS_ROARING:
+                segment.sort()
+
+        self._terms = terms
+        self._posting_data = data
+        self._posting_offs = offs
+    
     def add_document(self, doc_id: int, tokens: List[str], metadata: Dict = None):
+        self.add_document_stream(doc_id, tokens, metadata)
+    
+    def add_document_stream(self, doc_id: int, tokens: Iterable[str], metadata: Dict = None):
+        # Any iterable will do; terms are deduped as they are consumed
         terms = set(tokens)
 
+        index = self.index
+        added = 0
         for term in terms:
-            self.index[term].add(doc_id)
+            posting = index.get(term)
+            if posting is None:
+                # Interned keys let lookups with interned tokens match by identity
+                posting = index[sys.intern(term)] = Posting()
+            if doc_id not in posting:
+                posting.add(doc_id)
+                added += 1
         if metadata is None:
             metadata = {}
         self.documents[doc_id] = metadata
+        self.max_doc_id = max(self.max_doc_id, doc_id)
+        self._bitsets.clear()
+        self._reset_finalized()
 
         self.stats['total_documents'] = len(self.documents)
         self.stats['total_terms'] = len(self.index)
-        self.stats['index_size'] = sum(len(doc_ids) for doc_ids in self.index.values())
+        self.stats['index_size'] += added
+    
+    def get_postings(self, term: str) -> Posting:
+        return self.index.get(term) or Posting()
+    
+    def get_all_postings(self) -> Posting:
+        return Posting(range(1, self.stats['total_documents'] + 1))
+    
+    def is_dense(self) -> bool:
+        # A bitset spends one uint64 word per 64 ids; it pays off once those
+        # words hold about one document each
+        return 0 < self.max_doc_id < 64 * max(self.stats['total_documents'], 1)
+    
+    def get_bitset(self, term: str) -> np.ndarray:
+        bitset = self._bitsets.get(term)
+        if bitset is None:
+            bits = np.zeros(((self.max_doc_id >> 6) + 1) << 6, dtype=bool)
+            bits[np.fromiter(self.get_postings(term), dtype=np.int64)] = True
+            bitset = np.packbits(bits, bitorder='little').view(np.uint64)
+            self._bitsets[term] = bitset
+        return bitset
+    
+    def get_posting_array(self, term: str) -> np.ndarray:
+        self._finalize()
+        i = bisect_left(self._terms, term)
+        if i < len(self._terms) and self._terms[i] == term:
+            return self._posting_data[self._posting_offs[i]:self._posting_offs[i + 1]]
+        return self._posting_data[:0]
     
     def get_documents(self, term: str) -> Set[int]:
-        return self.index.get(term, set())
+        return set(self.get_postings(term))
     
     def get_document_count(self, term: str) -> int:
-        return len(self.get_documents(term))
+        return len(self.get_postings(term))
     
     def get_term_frequency(self, term: str) -> int:
         return self.get_document_count(term)
     
     def get_all_terms(self) -> List[str]:
-        return sorted(self.index.keys())
+        self._finalize()
+        return list(self._terms)
+    
+    def _terms_by_document_frequency(self, limit: int = None) -> np.ndarray:
+        self._finalize()
+        order = np.argsort(-np.diff(self._posting_offs), kind='stable')
+        return order[:limit] if limit else order
     
     def get_index_statistics(self) -> Dict:
-        term_frequencies = {
-            term: len(doc_ids) for term, doc_ids in self.index.items()
-        }
-
-        sorted_terms = sorted(term_frequencies.items(), key=lambda x: x[1], reverse=True)
+        top = self._terms_by_document_frequency(20)
+        doc_freqs = np.diff(self._posting_offs)
         
         return {
             'total_documents': self.stats['total_documents'],
@@ -58,12 +220,27 @@ class BooleanIndex:
                 if self.stats['total_documents'] > 0 else 0
             ),
             'top_terms': [
-                {'term': term, 'document_frequency': freq}
-                for term, freq in sorted_terms[:20]
+                {'term': self._terms[i], 'document_frequency': int(doc_freqs[i])}
+                for i in top.tolist()
             ]
         }
     
-    def build_from_corpus(self, corpus_dir: Path, tokenizer=None, stemmer=None):
+    def _add_results(self, results: Iterable[Optional[Tuple]]) -> Tuple[int, int]:
+        documents_processed = 0
+        errors = 0
+        for result in results:
+            if result is None:
+                errors += 1
+                continue
+            try:
+                self.add_document_stream(*result)
+            except Exception:
+                errors += 1
+                continue
+            documents_processed += 1
+        return documents_processed, errors
+    
+    def build_from_corpus(self, corpus_dir: Path, tokenizer=None, stemmer=None, workers: int = None):
         from tokenizer import Tokenizer
         
         if tokenizer is None:
@@ -78,37 +255,17 @@ class BooleanIndex:
         if not text_files:
             raise ValueError(f"No documents found in {corpus_dir}")
         
-        documents_processed = 0
-        errors = 0
-        
-        for text_file in text_files:
-            try:
-                doc_id_str = text_file.stem.split('_')[1]
-                doc_id = int(doc_id_str)
-
-                with open(text_file, 'r', encoding='utf-8') as f:
-                    content = f.read()
-
-                if 'CONTENT:' in content:
-                    content = content.split('CONTENT:')[1].strip()
-
-                tokens = tokenizer.tokenize(content)
-
-                if stemmer:
-                    tokens = stemmer.stem_tokens(tokens)
-
-                metadata = {}
-                if 'TITLE:' in content:
-                    title_line = [line for line in content.split('\n') if line.startswith('TITLE:')]
-                    if title_line:
-                        metadata['title'] = title_line[0].replace('TITLE:', '').strip()
-
-                self.add_document(doc_id, tokens, metadata)
-                documents_processed += 1
-                
-            except Exception as e:
-                errors += 1
-                continue
+        # A single core gains nothing from the pool but its start-up cost
+        workers = workers or os.cpu_count() or 1
+        if workers > 1 and len(text_files) >= PARALLEL_MIN_DOCUMENTS:
+            # Tokenizing and stemming run in the workers; postings are only
+            # ever updated here, in file order, so nothing has to be merged
+            with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(tokenizer, stemmer)) as pool:
+                results = pool.map(_process_document_worker, text_files, chunksize=32)
+                documents_processed, errors = self._add_results(results)
+        else:
+            results = (_process_document(text_file, tokenizer, stemmer) for text_file in text_files)
+            documents_processed, errors = self._add_results(results)
         
         return {
             'documents_processed': documents_processed,
@@ -116,40 +273,168 @@ class BooleanIndex:
             'index_statistics': self.get_index_statistics()
         }
     
-    def save(self, output_path: Path):
-        output_path = Path(output_path)
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-
-        index_data = {
+    def _index_data(self, as_lists: bool = True) -> Dict:
+        self._finalize()
+        offs = self._posting_offs.tolist()
+        data = self._posting_data.tolist() if as_lists else self._posting_data
+        
+        return {
             'index': {
-                term: sorted(list(doc_ids))
-                for term, doc_ids in self.index.items()
+                term: data[offs[i]:offs[i + 1]]
+                for i, term in enumerate(self._terms)
             },
             'documents': self.documents,
             'stats': self.stats
         }
+    
+    def _dumps(self, data: Dict) -> bytes:
+        if HAS_ORJSON:
+            return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        return json.dumps(data, ensure_ascii=False).encode('utf-8')
+    
+    def save(self, output_path: Path, format: str = None):
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+
+        if format is None:
+            format = INDEX_FORMATS.get(output_path.suffix, 'npz')
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(index_data, f, ensure_ascii=False, indent=2)
+        if format == 'npz':
+            self._save_npz(output_path)
+            return
+        
+        if format == 'msgpack':
+            if not HAS_MSGPACK:
+                raise ImportError("msgpack is required for .mpk index files")
+            blob = msgpack.packb(self._index_data(), use_bin_type=True)
+        elif format == 'json':
+            # orjson serializes the numpy slices directly; other encoders need lists
+            blob = self._dumps(self._index_data(as_lists=not HAS_ORJSON))
+        else:
+            raise ValueError(f"Unknown index format: {format}")
+        
+        output_path.write_bytes(blob)
+    
+    def _save_npz(self, output_path: Path):
+        self._finalize()
+        data = self._posting_data
+        offs = self._posting_offs
+
+        # Gaps between sorted ids are small and compress far better than the
+        # ids themselves; each term's first entry keeps its absolute id
+        deltas = data.copy()
+        deltas[1:] -= data[:-1]
+        starts = offs[:-1][offs[:-1] < offs[1:]]
+        deltas[starts] = data[starts]
+
+        meta = self._dumps({'documents': self.documents, 'stats': self.stats})
+        
+        with open(output_path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                terms=np.frombuffer('\0'.join(self._terms).encode('utf-8'), dtype=np.uint8),
+                posting_offs=offs,
+                posting_deltas=deltas,
+                meta=np.frombuffer(meta, dtype=np.uint8)
+            )
     
     def load(self, input_path: Path):
-        input_path = Path(input_path)
+        blob = Path(input_path).read_bytes()
+        
+        # Sniff the format: npz is a zip archive, JSON objects open with '{',
+        # msgpack maps never do either
+        if blob[:2] == b'PK':
+            self._load_npz(blob)
+            return
         
-        with open(input_path, 'r', encoding='utf-8') as f:
-            index_data = json.load(f)
+        if blob[:1] == b'{' or blob[:1].isspace():
+            index_data = orjson.loads(blob) if HAS_ORJSON else json.loads(blob)
+        elif HAS_MSGPACK:
+            index_data = msgpack.unpackb(blob, strict_map_key=False)
+        else:
+            raise ImportError("msgpack is required to load this index file")
 
-        self.index = {
-            term: set(doc_ids)
+        self.index = defaultdict(Posting, (
+            (sys.intern(term), Posting(doc_ids))
             for term, doc_ids in index_data['index'].items()
-        }
+        ))
+        self.max_doc_id = max((max(doc_ids) for doc_ids in index_data['index'].values() if doc_ids), default=0)
+        self._bitsets.clear()
+        self._reset_finalized()
+        self._load_metadata(index_data)
+    
+    def _load_npz(self, blob: bytes):
+        with np.load(io.BytesIO(blob)) as archive:
+            terms_blob = archive['terms'].tobytes().decode('utf-8')
+            offs = archive['posting_offs']
+            deltas = archive['posting_deltas']
+            meta = archive['meta'].tobytes()
+        
+        terms = list(map(sys.intern, terms_blob.split('\0'))) if offs.size > 1 else []
+        
+        # One cumsum over all terms; each term then subtracts the running
+        # total accumulated before its first entry
+        totals = np.zeros(deltas.size + 1, dtype=np.int64)
+        np.cumsum(deltas, out=totals[1:])
+        data = (totals[1:] - np.repeat(totals[offs[:-1]], np.diff(offs))).astype(np.uint32)
+        
+        ids = data.tolist()
+        bounds = offs.tolist()
+        self.index = defaultdict(Posting, (
+            (term, Posting(ids[bounds[i]:bounds[i + 1]]))
+            for i, term in enumerate(terms)
+        ))
+        self.max_doc_id = int(data.max()) if data.size else 0
+        self._bitsets.clear()
+        
+        # The archive already is the CSR snapshot
+        self._terms = terms
+        self._posting_data = data
+        self._posting_offs = offs.astype(np.int64)
         
-        self.documents = index_data.get('documents', {})
+        self._load_metadata(orjson.loads(meta) if HAS_ORJSON else json.loads(meta))
+    
+    def _load_metadata(self, index_data: Dict):
+        # JSON object keys are strings; documents are keyed by int doc id
+        self.documents = {
+            int(doc_id): metadata
+            for doc_id, metadata in index_data.get('documents', {}).items()
+        }
         self.stats = index_data.get('stats', {
             'total_documents': 0,
             'total_terms': 0,
             'index_size': 0
         })
     
+    def save_fast(self, output_path: Path):
+        # Local snapshot for quick restarts: the postings are pickled as they
+        # are, so nothing is converted on either side
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        
+        state = {
+            'index': dict(self.index),
+            'documents': self.documents,
+            'stats': self.stats,
+            'max_doc_id': self.max_doc_id
+        }
+        with open(output_path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    def load_fast(self, input_path: Path):
+        # Only for files written by save_fast; unpickling untrusted data is unsafe
+        with open(input_path, 'rb') as f:
+            state = pickle.load(f)
+        
+        self.index = defaultdict(Posting, (
+            (sys.intern(term), posting) for term, posting in state['index'].items()
+        ))
+        self.max_doc_id = state['max_doc_id']
+        self._bitsets.clear()
+        self._reset_finalized()
+        self.documents = state['documents']
+        self.stats = state['stats']
+    
     def export_to_text(self, output_path: Path, max_terms: int = None):
         output_path = Path(output_path)
         output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -163,18 +448,12 @@ class BooleanIndex:
             f.write("Term -> Document IDs\n")
             f.write("-" * 80 + "\n\n")
 
-            sorted_terms = sorted(
-                self.index.items(),
-                key=lambda x: len(x[1]),
-                reverse=True
-            )
-            
-            if max_terms:
-                sorted_terms = sorted_terms[:max_terms]
-            
-            for term, doc_ids in sorted_terms:
-                doc_list = sorted(list(doc_ids))
-                f.write(f"{term}: {len(doc_ids)} documents\n")
+            order = self._terms_by_document_frequency(max_terms)
+            offs = self._posting_offs
+            for i in order.tolist():
+                term = self._terms[i]
+                doc_list = self._posting_data[offs[i]:offs[i + 1]].tolist()
+                f.write(f"{term}: {len(doc_list)} documents\n")
                 f.write(f"  Documents: {doc_list[:20]}")
                 if len(doc_list) > 20:
                     f.write(f" ... (and {len(doc_list) - 20} more)")
@@ -24,8 +24,8 @@ def main():
     parser.add_argument(
         '--output',
         type=str,
-        default='boolean_index.json',
-        help='Output file for index (default: boolean_index.json)'
+        default='boolean_index.npz',
+        help='Output file for index; .json and .mpk select those formats (default: boolean_index.npz)'
     )
     parser.add_argument(
         '--text-output',
@@ -183,7 +183,7 @@ HTML_TEMPLATE = """
             <h3>Load Index</h3>
             <div class="form-group">
                 <label for="indexFile">Index File:</label>
-                <input type="text" id="indexFile" name="indexFile" placeholder="boolean_index.json" required>
+                <input type="text" id="indexFile" name="indexFile" placeholder="boolean_index.npz" required>
             </div>
             
             <button type="submit">Load Index</button>
@@ -420,7 +420,7 @@ def build_index():
         corpus_path = Path(corpus_dir)
         build_stats = index_instance.build_from_corpus(corpus_path, tokenizer, stemmer)
 
-        index_path = Path('boolean_index.json')
+        index_path = Path('boolean_index.npz')
         index_instance.save(index_path)
         
         return jsonify({
@@ -438,7 +438,7 @@ def load_index():
     
     try:
         data = request.json
-        index_file = data.get('index_file', 'boolean_index.json')
+        index_file = data.get('index_file', 'boolean_index.npz')
         
         index_instance = BooleanIndex()
         index_path = Path(index_file)
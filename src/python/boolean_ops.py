@@ -0,0 +1,99 @@
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+# Past this length ratio a binary search per element beats the linear merge
+GALLOP_RATIO = 32
+
+
+def _intersect_sorted_numpy(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    return np.intersect1d(a, b, assume_unique=True)
+
+
+def _union_sorted_numpy(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    # np.union1d goes through np.unique; a stable sort of two sorted runs is
+    # a single merge
+    merged = np.concatenate((a, b))
+    merged.sort(kind='stable')
+    keep = np.empty(merged.size, dtype=bool)
+    keep[:1] = True
+    np.not_equal(merged[1:], merged[:-1], out=keep[1:])
+    return merged[keep]
+
+
+if HAS_NUMBA:
+    @njit(cache=True)
+    def _intersect_sorted_jit(a, b):
+        if a.size > b.size:
+            a, b = b, a
+        out = np.empty(a.size, dtype=a.dtype)
+        k = 0
+        if b.size > GALLOP_RATIO * a.size:
+            lo = 0
+            for i in range(a.size):
+                lo += np.searchsorted(b[lo:], a[i])
+                if lo == b.size:
+                    break
+                if b[lo] == a[i]:
+                    out[k] = a[i]
+                    k += 1
+            return out[:k]
+
+        i = 0
+        j = 0
+        while i < a.size and j < b.size:
+            if a[i] < b[j]:
+                i += 1
+            elif a[i] > b[j]:
+                j += 1
+            else:
+                out[k] = a[i]
+                k += 1
+                i += 1
+                j += 1
+        return out[:k]
+
+    @njit(cache=True)
+    def _union_sorted_jit(a, b):
+        out = np.empty(a.size + b.size, dtype=a.dtype)
+        i = 0
+        j = 0
+        k = 0
+        while i < a.size and j < b.size:
+            if a[i] < b[j]:
+                out[k] = a[i]
+                i += 1
+            elif a[i] > b[j]:
+                out[k] = b[j]
+                j += 1
+            else:
+                out[k] = a[i]
+                i += 1
+                j += 1
+            k += 1
+        while i < a.size:
+            out[k] = a[i]
+            i += 1
+            k += 1
+        while j < b.size:
+            out[k] = b[j]
+            j += 1
+            k += 1
+        return out[:k]
+
+
+def intersect_sorted(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if HAS_NUMBA:
+        return _intersect_sorted_jit(a, b)
+    return _intersect_sorted_numpy(a, b)
+
+
+def union_sorted(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    if HAS_NUMBA:
+        return _union_sorted_jit(a, b)
+    return _union_sorted_numpy(a, b)
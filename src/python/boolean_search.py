@@ -1,8 +1,15 @@
 import re
-from typing import List, Set, Dict, Tuple, Optional
+from typing import List, Set, Dict, Tuple, Optional, Callable
 from pathlib import Path
+from functools import lru_cache
 
-from boolean_index import BooleanIndex
+import numpy as np
+
+from boolean_index import BooleanIndex, Posting, HAS_ROARING
+from boolean_ops import intersect_sorted, union_sorted
+
+
+QUERY_CACHE_SIZE = 4096
 
 
 class BooleanSearch:
@@ -10,6 +17,8 @@ class BooleanSearch:
     def __init__(self, index: BooleanIndex):
         self.index = index
         self.operators = {'AND', 'OR', 'NOT'}
+        self._parse_cached = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._parse_normalized)
+        self._compiled = lru_cache(maxsize=QUERY_CACHE_SIZE)(self._compile_query)
     
     def _tokenize_query(self, query: str) -> List[str]:
         query = query.strip()
@@ -78,56 +87,125 @@ class BooleanSearch:
         
         return output
     
-    def _evaluate_term(self, term: str) -> Set[int]:
-        term = term.strip().strip('"').strip("'")
-        return self.index.get_documents(term)
+    def _parse_normalized(self, query: str) -> Tuple[str, ...]:
+        return tuple(self._parse_query(query))
     
-    def _evaluate_query_postfix(self, postfix: List) -> Set[int]:
+    def _build_query_tree(self, postfix: List) -> Optional[Tuple]:
+        # Same stack discipline as a plain postfix evaluation, but building
+        # nodes; chained ANDs/ORs are flattened so their operands can be reordered
         stack = []
         
         for token in postfix:
-            if token.upper() == 'NOT':
+            op = token.upper()
+            if op == 'NOT':
                 if not stack:
                     continue
-                operand = stack.pop()
-                all_docs = set(range(1, self.index.stats['total_documents'] + 1))
-                result = all_docs - operand
-                stack.append(result)
-            elif token.upper() == 'AND':
+                stack.append(('NOT', stack.pop()))
+            elif op in ('AND', 'OR'):
                 if len(stack) < 2:
                     continue
                 right = stack.pop()
                 left = stack.pop()
-                result = left & right
-                stack.append(result)
-            elif token.upper() == 'OR':
-                if len(stack) < 2:
-                    continue
-                right = stack.pop()
-                left = stack.pop()
-                result = left | right
-                stack.append(result)
+                children = []
+                for child in (left, right):
+                    if child[0] == op:
+                        children.extend(child[1:])
+                    else:
+                        children.append(child)
+                stack.append((op, *children))
             else:
-                doc_ids = self._evaluate_term(token)
-                stack.append(doc_ids)
+                stack.append(('TERM', token))
         
         if not stack:
-            return set()
+            return None
         
         return stack.pop()
     
+    def _compile(self, node: Tuple) -> Tuple[Callable[[], Posting], Callable[[], int]]:
+        # Each node becomes a pair of closures: one evaluates it, the other
+        # gives an upper bound on its size (min for AND, sum for OR) so AND
+        # can order its operands against the index as it is at call time
+        index = self.index
+        get = index.get_postings
+        kind = node[0]
+        
+        if kind == 'TERM':
+            term = node[1].strip().strip('"').strip("'")
+            return (lambda: get(term)), (lambda: len(get(term)))
+        
+        if kind == 'NOT':
+            evaluate_operand = self._compile(node[1])[0]
+            return (
+                lambda: index.get_all_postings() - evaluate_operand(),
+                lambda: index.stats['total_documents']
+            )
+        
+        if kind == 'OR':
+            children = [self._compile(child) for child in node[1:]]
+            evaluators = [evaluate for evaluate, _ in children]
+            estimates = [estimate for _, estimate in children]
+            
+            def evaluate_or() -> Posting:
+                result = Posting()
+                for evaluate in evaluators:
+                    result |= evaluate()
+                return result
+            
+            return evaluate_or, lambda: sum(estimate() for estimate in estimates)
+        
+        positive = [self._compile(child) for child in node[1:] if child[0] != 'NOT']
+        negative = [self._compile(child[1])[0] for child in node[1:] if child[0] == 'NOT']
+        
+        def evaluate_and() -> Posting:
+            # Smallest operand first, and stop as soon as nothing is left
+            if positive:
+                ordered = sorted(positive, key=lambda compiled: compiled[1]())
+                result = ordered[0][0]()
+                for evaluate, _ in ordered[1:]:
+                    if not result:
+                        return result
+                    result = result & evaluate()
+            else:
+                result = index.get_all_postings()
+            
+            # 'a AND NOT b' is a difference; no need to build the complement of b
+            for evaluate in negative:
+                if not result:
+                    break
+                result = result - evaluate()
+            
+            return result
+        
+        return evaluate_and, lambda: min(
+            (estimate() for _, estimate in positive),
+            default=index.stats['total_documents']
+        )
+    
+    def _compile_query(self, postfix: Tuple[str, ...]) -> Callable[[], Posting]:
+        tree = self._build_query_tree(postfix)
+        
+        if tree is None:
+            return Posting
+        
+        return self._compile(tree)[0]
+    
+    def _evaluate_query_postfix(self, postfix: List) -> Posting:
+        return self._compiled(tuple(postfix))()
+    
     def search(self, query: str) -> Tuple[Set[int], Dict]:
         if not query or not query.strip():
             return set(), {'error': 'Empty query'}
         
         try:
-            postfix = self._parse_query(query)
+            # Index terms are lowercase and operators are case-insensitive, so
+            # 'cat AND dog' and 'CAT and DOG' share one cache entry
+            postfix = self._parse_cached(query.strip().lower())
 
-            result_docs = self._evaluate_query_postfix(postfix)
+            result_docs = set(self._evaluate_query_postfix(postfix))
             
             metadata = {
                 'query': query,
-                'parsed_query': postfix,
+                'parsed_query': list(postfix),
                 'result_count': len(result_docs),
                 'total_documents': self.index.stats['total_documents']
             }
@@ -144,21 +222,66 @@ class BooleanSearch:
         if operator not in ('AND', 'OR'):
             operator = 'AND'
 
-        doc_sets = [self.index.get_documents(term.strip()) for term in terms]
+        # Roaring already keeps dense containers as bitsets; plain sets gain
+        # from a flat numpy bitset when the doc-id range is compact
+        if not HAS_ROARING:
+            terms = [term.strip() for term in terms]
+            if self.index.is_dense():
+                return self._search_bitsets(terms, operator)
+            return self._search_arrays(terms, operator)
+
+        doc_sets = [self.index.get_postings(term.strip()) for term in terms]
         
         if not doc_sets:
             return set()
 
         if operator == 'AND':
+            doc_sets.sort(key=len)
             result = doc_sets[0]
             for doc_set in doc_sets[1:]:
+                if not result:
+                    break
                 result = result & doc_set
         else:
             result = doc_sets[0]
             for doc_set in doc_sets[1:]:
                 result = result | doc_set
         
-        return result
+        return set(result)
+    
+    def _search_bitsets(self, terms: List[str], operator: str) -> Set[int]:
+        combine = np.bitwise_and if operator == 'AND' else np.bitwise_or
+        
+        result = self.index.get_bitset(terms[0]).copy()
+        for term in terms[1:]:
+            combine(result, self.index.get_bitset(term), out=result)
+        
+        # Only expand the words that have any bit set
+        words = np.flatnonzero(result)
+        bits = np.unpackbits(result[words].view(np.uint8), bitorder='little').reshape(-1, 64)
+        rows, cols = np.nonzero(bits)
+        return set(((words[rows] << 6) + cols).tolist())
+    
+    def _search_arrays(self, terms: List[str], operator: str) -> Set[int]:
+        arrays = [self.index.get_posting_array(term) for term in terms]
+        
+        if operator == 'AND':
+            arrays.sort(key=len)
+            result = arrays[0]
+            for array in arrays[1:]:
+                if not result.size:
+                    break
+                result = intersect_sorted(result, array)
+        else:
+            # Merge pairwise so each id is copied O(log n) times, not once per term
+            while len(arrays) > 1:
+                arrays = [
+                    union_sorted(arrays[i], arrays[i + 1]) if i + 1 < len(arrays) else arrays[i]
+                    for i in range(0, len(arrays), 2)
+                ]
+            result = arrays[0]
+        
+        return set(result.tolist())
     
     def get_results_with_metadata(self, doc_ids: Set[int], limit: int = None) -> List[Dict]:
         sorted_docs = sorted(list(doc_ids))
@@ -153,7 +153,7 @@ HTML_TEMPLATE = """
             <h3>Load Index</h3>
             <div class="form-group">
                 <label for="indexFile">Index File:</label>
-                <input type="text" id="indexFile" name="indexFile" placeholder="boolean_index.json" required>
+                <input type="text" id="indexFile" name="indexFile" placeholder="boolean_index.npz" required>
             </div>
             
             <button type="submit">Load Index</button>
@@ -332,7 +332,7 @@ def load_index():
     
     try:
         data = request.json
-        index_file = data.get('index_file', 'boolean_index.json')
+        index_file = data.get('index_file', 'boolean_index.npz')
         
         index_path = Path(index_file)
         search_engine = BooleanSearchEngine(index_path=index_path)
@@ -43,6 +43,12 @@ def main():
         default=500,
         help='Minimum content length in characters (default: 500)'
     )
+    parser.add_argument(
+        '--parse-workers',
+        type=int,
+        default=0,
+        help='Worker processes for HTML parsing (default: 0, parse in the crawler process)'
+    )
     parser.add_argument(
         '--user-agent',
         type=str,
@@ -63,6 +69,7 @@ def main():
         user_agent=args.user_agent
     )
     crawler.min_content_length = args.min_content_length
+    crawler.parse_workers = args.parse_workers
     
     print(f"Starting crawl with {len(args.seed_urls)} seed URLs")
     print(f"Max pages: {args.max_pages}, Max depth: {args.max_depth}")
@@ -1,9 +1,42 @@
 import re
-from typing import List, Dict, Set
+import sys
+from typing import List, Dict, Set, Tuple, Iterable, Iterator
 from pathlib import Path
+from functools import lru_cache
+from collections import Counter
 import json
 
 
+# Word frequencies are Zipfian, so a bounded cache catches nearly every repeat
+STEM_CACHE_SIZE = 131072
+
+ENGLISH_SUFFIXES = tuple(sorted(
+    ['ing', 'ed', 'er', 'est', 'ly', 'tion', 'sion', 'ness', 'ment',
+     'able', 'ible', 'ful', 'less', 'ous', 'ious', 'es', 's'],
+    key=len, reverse=True
+))
+
+
+def _suffix_table(suffixes: List[str]) -> Tuple[Tuple[int, ...], Dict[str, int]]:
+    # Each suffix keeps the position of its first occurrence, so probing the
+    # few distinct lengths finds the same match as scanning the list in order
+    positions = {}
+    for i, suffix in enumerate(suffixes):
+        positions.setdefault(suffix, i)
+    return tuple(sorted({len(suffix) for suffix in positions})), positions
+
+
+def _matching_suffixes(word: str, table: Tuple[Tuple[int, ...], Dict[str, int]], margin: int) -> List[str]:
+    lengths, positions = table
+    matches = [
+        word[-n:] for n in lengths
+        if len(word) > n + margin and word[-n:] in positions
+    ]
+    if len(matches) > 1:
+        matches.sort(key=positions.__getitem__)
+    return matches
+
+
 class RussianStemmer:
 
     def __init__(self):
@@ -52,6 +85,30 @@ class RussianStemmer:
         ]
 
         self.common_endings.sort(key=len, reverse=True)
+
+        self._suffix_groups = [
+            _suffix_table(suffixes) for suffixes in (
+                self.reflexive_suffixes, self.adjectival_suffixes,
+                self.verb_suffixes, self.noun_suffixes
+            )
+        ]
+        self._common_endings = _suffix_table(self.common_endings)
+
+        # Cached per instance: the suffix tables above are instance state
+        self._stem_cached = lru_cache(maxsize=STEM_CACHE_SIZE)(self._stem_interned)
+    
+    def __getstate__(self):
+        # The cache wrapper cannot be pickled; worker processes start empty
+        state = self.__dict__.copy()
+        del state['_stem_cached']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._stem_cached = lru_cache(maxsize=STEM_CACHE_SIZE)(self._stem_interned)
+    
+    def clear_cache(self):
+        self._stem_cached.cache_clear()
     
     def _is_vowel(self, char: str) -> bool:
         return char.lower() in self.vowels
@@ -84,38 +141,30 @@ class RussianStemmer:
         return word
     
     def stem(self, word: str) -> str:
+        return self._stem_cached(word)
+    
+    def _stem_interned(self, word: str) -> str:
+        # Runs once per distinct word thanks to the cache; tokens sharing a
+        # stem then share one string, which the index keys reuse
+        return sys.intern(self._stem(word))
+    
+    def _stem(self, word: str) -> str:
         if not word or len(word) < 2:
             return word
         
         word = word.lower().strip()
 
-        for suffix in self.reflexive_suffixes:
-            if word.endswith(suffix) and len(word) > len(suffix) + 2:
-                word = word[:-len(suffix)]
-                break
-
-        for suffix in self.adjectival_suffixes:
-            if word.endswith(suffix) and len(word) > len(suffix) + 2:
-                word = word[:-len(suffix)]
-                break
-
-        for suffix in self.verb_suffixes:
-            if word.endswith(suffix) and len(word) > len(suffix) + 2:
-                word = word[:-len(suffix)]
-                break
-
-        for suffix in self.noun_suffixes:
-            if word.endswith(suffix) and len(word) > len(suffix) + 2:
-                word = word[:-len(suffix)]
-                break
+        for table in self._suffix_groups:
+            matches = _matching_suffixes(word, table, 2)
+            if matches:
+                word = word[:-len(matches[0])]
 
         original_word = word
-        for ending in self.common_endings:
-            if word.endswith(ending) and len(word) > len(ending) + 1:
-                stem = word[:-len(ending)]
-                if len(stem) >= 2 and self._has_vowel(stem):
-                    word = stem
-                    break
+        for ending in _matching_suffixes(word, self._common_endings, 1):
+            stem = word[:-len(ending)]
+            if not self.vowels.isdisjoint(stem):
+                word = stem
+                break
 
         if len(word) < 2:
             return original_word[:2] if len(original_word) >= 2 else original_word
@@ -123,14 +172,13 @@ class RussianStemmer:
         return word
     
     def stem_tokens(self, tokens: List[str]) -> List[str]:
-        return [self.stem(token) for token in tokens]
+        return list(map(self._stem_cached, tokens))
+    
+    def iter_stems(self, tokens: Iterable[str]) -> Iterator[str]:
+        return map(self._stem_cached, tokens)
     
     def get_stem_frequencies(self, tokens: List[str]) -> Dict[str, int]:
-        stems = self.stem_tokens(tokens)
-        frequencies = {}
-        for stem in stems:
-            frequencies[stem] = frequencies.get(stem, 0) + 1
-        return frequencies
+        return dict(Counter(self.stem_tokens(tokens)))
     
     def get_stem_vocabulary(self, tokens: List[str]) -> Set[str]:
         stems = self.stem_tokens(tokens)
@@ -144,10 +192,33 @@ class Stemmer:
         
         if self.language == 'russian':
             self.stemmer = RussianStemmer()
+            self._stem_cached = self.stemmer._stem_cached
         else:
             self.stemmer = None
+            self._stem_cached = lru_cache(maxsize=STEM_CACHE_SIZE)(self._stem_interned)
+    
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_stem_cached']
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.stemmer is not None:
+            self._stem_cached = self.stemmer._stem_cached
+        else:
+            self._stem_cached = lru_cache(maxsize=STEM_CACHE_SIZE)(self._stem_interned)
+    
+    def clear_cache(self):
+        self._stem_cached.cache_clear()
     
     def stem(self, word: str) -> str:
+        return self._stem_cached(word)
+    
+    def _stem_interned(self, word: str) -> str:
+        return sys.intern(self._stem(word))
+    
+    def _stem(self, word: str) -> str:
         if not word:
             return word
         
@@ -159,12 +230,7 @@ class Stemmer:
     def _stem_english(self, word: str) -> str:
         word = word.lower()
 
-        suffixes = [
-            'ing', 'ed', 'er', 'est', 'ly', 'tion', 'sion', 'ness', 'ment',
-            'able', 'ible', 'ful', 'less', 'ous', 'ious', 'es', 's'
-        ]
-        
-        for suffix in sorted(suffixes, key=len, reverse=True):
+        for suffix in ENGLISH_SUFFIXES:
             if word.endswith(suffix) and len(word) > len(suffix) + 2:
                 word = word[:-len(suffix)]
                 break
@@ -172,14 +238,13 @@ class Stemmer:
         return word
     
     def stem_tokens(self, tokens: List[str]) -> List[str]:
-        return [self.stem(token) for token in tokens]
+        return list(map(self._stem_cached, tokens))
+    
+    def iter_stems(self, tokens: Iterable[str]) -> Iterator[str]:
+        return map(self._stem_cached, tokens)
     
     def get_stem_frequencies(self, tokens: List[str]) -> Dict[str, int]:
-        stems = self.stem_tokens(tokens)
-        frequencies = {}
-        for stem in stems:
-            frequencies[stem] = frequencies.get(stem, 0) + 1
-        return frequencies
+        return dict(Counter(self.stem_tokens(tokens)))
     
     def get_stem_vocabulary(self, tokens: List[str]) -> Set[str]:
         stems = self.stem_tokens(tokens)
@@ -187,13 +252,11 @@ class Stemmer:
     
     def process_document(self, tokens: List[str]) -> Dict:
         stems = self.stem_tokens(tokens)
-        frequencies = self.get_stem_frequencies(tokens)
-        vocabulary = self.get_stem_vocabulary(tokens)
+        frequencies = dict(Counter(stems))
+        vocabulary = set(frequencies)
 
-        token_to_stem = {}
-        for token, stem in zip(tokens, stems):
-            if token not in token_to_stem:
-                token_to_stem[token] = stem
+        # Stemming is deterministic, so repeated tokens map to the same stem
+        token_to_stem = dict(zip(tokens, stems))
         
         return {
             'stems': stems,
@@ -216,9 +279,7 @@ class Stemmer:
             all_stems.extend(result['stems'])
             all_vocabulary.update(result['stem_vocabulary'])
         
-        corpus_frequencies = {}
-        for stem in all_stems:
-            corpus_frequencies[stem] = corpus_frequencies.get(stem, 0) + 1
+        corpus_frequencies = dict(Counter(all_stems))
         
         corpus_stats = {
             'total_documents': len(corpus_tokens),
@@ -1,10 +1,188 @@
 import re
-from typing import List, Dict, Set
+import sys
+from typing import List, Dict, Set, Tuple, Iterable, Iterator
 from pathlib import Path
 import json
+import hashlib
+import sqlite3
+import multiprocessing as mp
+from itertools import filterfalse
+from collections import Counter
+import string
+from contextlib import closing
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+# Runs of Latin or Cyrillic letters, or runs of digits; 'abc123' gives two
+# tokens. Explicit ranges match far faster than a Unicode letter class
+_TOKEN_RE = re.compile(r'[a-zA-Z\u0400-\u045f]+|[0-9]+')
+_PUNCTUATION_RE = re.compile(r'[^\w\s]')
+_SPLIT_RE = re.compile(r'[\s\.,;:!?\-—–\(\)\[\]{}"\''']+', re.UNICODE)
+
+
+# The ASCII part of _TOKEN_RE is [a-zA-Z]+|[0-9]+: letters and digits stay,
+# every other byte becomes a space. The second table also lowercases, so
+# ASCII text needs no separate str.lower() pass
+_ASCII_WORD_CHARS = frozenset(string.ascii_letters + string.digits)
+_ASCII_WORD_TABLE = bytes(
+    code if chr(code) in _ASCII_WORD_CHARS else ord(' ') for code in range(256)
+)
+_ASCII_LOWER_WORD_TABLE = _ASCII_WORD_TABLE.translate(bytes.maketrans(
+    string.ascii_uppercase.encode('ascii'), string.ascii_lowercase.encode('ascii')
+))
+# Byte classes: every letter becomes b'a', every digit b'0', the rest b' '
+_ASCII_CLASS_TABLE = bytes(
+    ord('a') if chr(code) in string.ascii_letters
+    else ord('0') if chr(code) in string.digits
+    else ord(' ')
+    for code in range(256)
+)
+
+
+STOPWORDS_RU = frozenset(map(sys.intern, {
+    'и', 'в', 'на', 'с', 'по', 'для', 'от', 'из', 'к', 'о', 'а', 'как',
+    'что', 'это', 'так', 'он', 'она', 'они', 'мы', 'вы', 'я', 'ты',
+    'быть', 'был', 'была', 'было', 'были', 'есть', 'бы', 'не', 'нет',
+    'но', 'или', 'если', 'то', 'же', 'ли', 'уже', 'еще', 'тоже',
+    'все', 'всего', 'всех', 'всегда',
+    'который', 'которая', 'которое', 'которые', 'которого', 'которой',
+    'которым', 'которыми', 'котором', 'которую',
+    'этот', 'эта', 'эти', 'этого', 'этой', 'этому', 'этим',
+    'этими', 'этом', 'эту',
+    'тот', 'та', 'те', 'того', 'той', 'тому', 'тем', 'теми', 'том', 'ту',
+    'где', 'когда', 'почему', 'зачем', 'куда', 'откуда',
+    'при', 'про', 'под', 'над', 'перед', 'за', 'между', 'среди',
+    'через', 'около', 'возле', 'вдоль', 'вокруг', 'внутри', 'вне',
+    'до', 'после', 'во', 'со', 'об', 'обо'
+}))
+
+STOPWORDS_EN = frozenset(map(sys.intern, {
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'be',
+    'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
+    'would', 'should', 'could', 'may', 'might', 'must', 'can', 'this',
+    'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they',
+    'me', 'him', 'her', 'us', 'them', 'my', 'your', 'his', 'her', 'its',
+    'our', 'their', 'what', 'which', 'who', 'whom', 'whose', 'where',
+    'when', 'why', 'how', 'all', 'each', 'every', 'both', 'few', 'more',
+    'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own',
+    'same', 'so', 'than', 'too', 'very', 'just', 'now'
+}))
+
+STOPWORDS = STOPWORDS_RU | STOPWORDS_EN
+
+# Below this many files the pool start-up costs more than it saves
+PARALLEL_MIN_DOCUMENTS = 1000
+
+# Stored with every token cache entry: bump it whenever a change to the
+# regexes, stopwords or token pipeline changes what a document tokenizes to
+TOKENIZER_VERSION = 2
+
+TOKEN_CACHE_FILE = '.tok_cache.sqlite'
+# Keeps each IN (...) lookup under SQLite's bound-parameter limit
+_CACHE_LOOKUP_BATCH = 500
+
+_worker_tokenizer = None
+_worker_return_tokens = True
+
+
+def _init_worker(tokenizer, return_tokens):
+    global _worker_tokenizer, _worker_return_tokens
+    _worker_tokenizer = tokenizer
+    _worker_return_tokens = return_tokens
+
+
+def _tokenize_one(job):
+    position, document_path = job
+    return position, _worker_tokenizer.tokenize_document(document_path, _worker_return_tokens)
+
+
+def _write_json(path: Path, data):
+    # orjson writes UTF-8 directly, as ensure_ascii=False does, and encodes
+    # the Counters without going through the pure-Python indenting encoder
+    if HAS_ORJSON:
+        path.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+    else:
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+
+class _TokenCache:
+    # One row per document path and tokenizer settings, so an edited file
+    # replaces its entry; rows from another TOKENIZER_VERSION are deleted on
+    # open. clear() (tokenizer_cli --clear-cache) empties the whole table
+
+    def __init__(self, path: Path, settings: bytes = b''):
+        self.settings = settings
+        self.db = sqlite3.connect(str(path))
+        try:
+            with self.db:
+                # Keyed by content hash alone; it could never drop stale rows
+                self.db.execute('DROP TABLE IF EXISTS tokens')
+                self.db.execute(
+                    'CREATE TABLE IF NOT EXISTS documents (path TEXT NOT NULL, settings BLOB NOT NULL, '
+                    'version INTEGER NOT NULL, digest BLOB NOT NULL, tokens TEXT NOT NULL, '
+                    'PRIMARY KEY (path, settings))'
+                )
+                self.db.execute('DELETE FROM documents WHERE version != ?', (TOKENIZER_VERSION,))
+        except sqlite3.Error:
+            self.db.close()
+            raise
+    
+    @staticmethod
+    def digest(document_path: Path):
+        try:
+            return hashlib.blake2b(Path(document_path).read_bytes(), digest_size=16).digest()
+        except OSError:
+            return None
+    
+    def get_many(self, entries: List[Tuple[str, bytes]]) -> Dict[str, List[str]]:
+        digests = dict(entries)
+        paths = list(digests)
+        found = {}
+        for start in range(0, len(paths), _CACHE_LOOKUP_BATCH):
+            batch = paths[start:start + _CACHE_LOOKUP_BATCH]
+            query = (f"SELECT path, digest, tokens FROM documents WHERE settings = ? "
+                     f"AND path IN ({','.join('?' * len(batch))})")
+            for path, digest, joined in self.db.execute(query, [self.settings, *batch]):
+                # A changed file has a new digest and misses
+                if digest == digests[path]:
+                    # Tokens never contain whitespace, so a space-joined string
+                    # round-trips and splits in one C call
+                    found[path] = list(map(sys.intern, joined.split()))
+        return found
+    
+    def put_many(self, entries: Iterable[Tuple[str, bytes, List[str]]]):
+        with self.db:
+            self.db.executemany(
+                'INSERT OR REPLACE INTO documents VALUES (?, ?, ?, ?, ?)',
+                ((path, self.settings, TOKENIZER_VERSION, digest, ' '.join(tokens))
+                 for path, digest, tokens in entries)
+            )
+    
+    def clear(self):
+        with self.db:
+            self.db.execute('DELETE FROM documents')
+        self.db.execute('VACUUM')
+    
+    def close(self):
+        self.db.close()
+
+
+def clear_token_cache(output_dir: Path):
+    cache_file = Path(output_dir) / TOKEN_CACHE_FILE
+    if cache_file.exists():
+        with closing(_TokenCache(cache_file)) as cache:
+            cache.clear()
 
 
 class Tokenizer:
+
     def __init__(self, lowercase: bool = True, remove_punctuation: bool = False, 
                  min_length: int = 1, remove_stopwords: bool = False):
 
@@ -13,76 +191,60 @@ class Tokenizer:
         self.min_length = min_length
         self.remove_stopwords = remove_stopwords
         
-        self.stopwords = self._load_stopwords() if remove_stopwords else set()
+        self.stopwords = STOPWORDS if remove_stopwords else frozenset()
+    
+    def tokenize(self, text: str) -> List[str]:
+        # Tokens are interned: repeats share one str object, so counting and
+        # indexing hash and compare them by identity
+        return list(self.iter_tokens(text))
+    
+    def _find_words(self, text: str) -> List[str]:
+        # ASCII text can skip the regex: with every other character turned
+        # into a space, split() finds the same words unless one mixes letters
+        # and digits, which the regex would cut in two. A letter next to a
+        # digit shows up as b'a0' or b'0a' in the byte-class string, a table
+        # lookup and substring search instead of two more split() passes
+        if text.isascii():
+            raw = text.encode('ascii')
+            classes = raw.translate(_ASCII_CLASS_TABLE)
+            if b'a0' not in classes and b'0a' not in classes:
+                table = _ASCII_LOWER_WORD_TABLE if self.lowercase else _ASCII_WORD_TABLE
+                return raw.translate(table).decode('ascii').split()
 
-        self.word_pattern = re.compile(
-            r'[а-ѝёН-ЯНa-zA-Z]+|[0-9]+|[а-ѝёН-ЯНa-zA-Z0-9]+',
-            re.UNICODE
-        )
+        # Lowercasing the whole text is one C call instead of one per token
+        if self.lowercase:
+            text = text.lower()
 
-        self.split_pattern = re.compile(
-            r'[\s\.,;:!?\-—–\(\)\[\]{}"\''']+',
-            re.UNICODE
-        )
+        # findall beats finditer by far: it builds no Match objects
+        return _TOKEN_RE.findall(text)
     
-    def _load_stopwords(self) -> Set[str]:
-        stopwords = {
-            'и', 'в', 'на', 'ѝ', 'по', 'длѝ', 'от', 'из', 'к', 'о', 'а', 'как',
-            'что', 'ѝто', 'так', 'он', 'она', 'они', 'мы', 'вы', 'ѝ', 'ты',
-            'быть', 'был', 'была', 'было', 'были', 'еѝть', 'бы', 'не', 'нет',
-            'но', 'или', 'еѝли', 'то', 'же', 'ли', 'уже', 'еще', 'тоже',
-            'вѝе', 'вѝего', 'вѝех', 'вѝегда', 'вѝегда', 'вѝе', 'вѝе',
-            'который', 'котораѝ', 'которое', 'которые', 'которого', 'которой',
-            'которым', 'которыми', 'котором', 'которой', 'которую',
-            'ѝтот', 'ѝта', 'ѝто', 'ѝти', 'ѝтого', 'ѝтой', 'ѝтому', 'ѝтим',
-            'ѝтими', 'ѝтом', 'ѝту',
-            'тот', 'та', 'те', 'того', 'той', 'тому', 'тем', 'теми', 'том', 'ту',
-            'где', 'когда', 'как', 'почему', 'зачем', 'куда', 'откуда',
-            'при', 'про', 'под', 'над', 'перед', 'за', 'между', 'ѝреди',
-            'через', 'около', 'возле', 'вдоль', 'вокруг', 'внутри', 'вне',
-            'до', 'поѝле', 'во', 'ѝо', 'об', 'обо',
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
-            'of', 'with', 'by', 'from', 'as', 'is', 'was', 'are', 'were', 'be',
-            'been', 'being', 'have', 'has', 'had', 'do', 'does', 'did', 'will',
-            'would', 'should', 'could', 'may', 'might', 'must', 'can', 'this',
-            'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they',
-            'me', 'him', 'her', 'us', 'them', 'my', 'your', 'his', 'her', 'its',
-            'our', 'their', 'what', 'which', 'who', 'whom', 'whose', 'where',
-            'when', 'why', 'how', 'all', 'each', 'every', 'both', 'few', 'more',
-            'most', 'other', 'some', 'such', 'no', 'nor', 'not', 'only', 'own',
-            'same', 'so', 'than', 'too', 'very', 'just', 'now'
-        }
-        return stopwords
-    
-    def tokenize(self, text: str) -> List[str]:
+    def iter_tokens(self, text: str) -> Iterator[str]:
+        # Lazy twin of tokenize() for callers that consume tokens once; built
+        # from map/filter so the common path runs without Python frames
         if not text:
-            return []
+            return iter(())
 
-        tokens = self.word_pattern.findall(text)
+        tokens = iter(self._find_words(text))
 
-        processed_tokens = []
-        for token in tokens:
-            if self.remove_punctuation:
-                token = re.sub(r'[^\w\s]', '', token)
+        if self.remove_punctuation:
+            tokens = (_PUNCTUATION_RE.sub('', token) for token in tokens)
 
-            if self.lowercase:
-                token = token.lower()
+        # Matches are never empty, so length only matters past 1 or once
+        # punctuation stripping may have emptied a token
+        if self.min_length > 1 or self.remove_punctuation:
+            min_length = self.min_length
+            tokens = (token for token in tokens if len(token) >= min_length)
 
-            if len(token) < self.min_length:
-                continue
+        if self.remove_stopwords:
+            tokens = filterfalse(self.stopwords.__contains__, tokens)
 
-            if self.remove_stopwords and token in self.stopwords:
-                continue
-            
-            processed_tokens.append(token)
-        
-        return processed_tokens
+        return map(sys.intern, tokens)
     
     def tokenize_simple(self, text: str) -> List[str]:
         if not text:
             return []
 
-        tokens = self.split_pattern.split(text)
+        tokens = _SPLIT_RE.split(text)
         
         processed_tokens = []
         for token in tokens:
@@ -100,39 +262,47 @@ class Tokenizer:
             if self.remove_stopwords and token in self.stopwords:
                 continue
             
-            processed_tokens.append(token)
+            processed_tokens.append(sys.intern(token))
         
         return processed_tokens
     
     def get_token_frequencies(self, tokens: List[str]) -> Dict[str, int]:
-        frequencies = {}
-        for token in tokens:
-            frequencies[token] = frequencies.get(token, 0) + 1
-        return frequencies
+        return Counter(tokens)
     
     def get_vocabulary(self, tokens: List[str]) -> Set[str]:
         return set(tokens)
     
-    def tokenize_document(self, document_path: Path) -> Dict:
-        try:
-            with open(document_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+    def _read_document_content(self, document_path: Path) -> str:
+        content = Path(document_path).read_text(encoding='utf-8')
 
-            if 'CONTENT:' in content:
-                content = content.split('CONTENT:')[1].strip()
-            
-            tokens = self.tokenize(content)
-            frequencies = self.get_token_frequencies(tokens)
-            vocabulary = self.get_vocabulary(tokens)
-            
-            return {
-                'document_id': document_path.stem,
-                'total_tokens': len(tokens),
-                'unique_tokens': len(vocabulary),
-                'tokens': tokens,
-                'frequencies': frequencies,
-                'vocabulary': list(vocabulary)
-            }
+        # maxsplit keeps the old 'text up to a second marker' result
+        # without splitting the rest of the document
+        if 'CONTENT:' in content:
+            content = content.split('CONTENT:', 2)[1].strip()
+        return content
+    
+    def tokenize_stream(self, document_path: Path) -> Iterator[str]:
+        return self.iter_tokens(self._read_document_content(document_path))
+    
+    def _document_result(self, document_path: Path, tokens: List[str], return_tokens: bool) -> Dict:
+        # The counter's keys already are the vocabulary
+        frequencies = self.get_token_frequencies(tokens)
+        
+        result = {
+            'document_id': document_path.stem,
+            'total_tokens': len(tokens),
+            'unique_tokens': len(frequencies),
+            'frequencies': frequencies
+        }
+        if return_tokens:
+            result['tokens'] = tokens
+            result['vocabulary'] = list(frequencies)
+        return result
+    
+    def tokenize_document(self, document_path: Path, return_tokens: bool = True) -> Dict:
+        try:
+            tokens = self.tokenize(self._read_document_content(document_path))
+            return self._document_result(document_path, tokens, return_tokens)
         except Exception as e:
             return {
                 'document_id': document_path.stem,
@@ -144,7 +314,54 @@ class Tokenizer:
                 'vocabulary': []
             }
     
-    def tokenize_corpus(self, corpus_dir: Path, output_dir: Path = None) -> Dict:
+    def _tokenize_documents_parallel(self, text_files: List[Path], processes: int,
+                                     return_tokens: bool) -> List[Dict]:
+        chunksize = max(1, len(text_files) // (processes * 4))
+        document_stats = [None] * len(text_files)
+        
+        # One tokenizer per worker, set up once; results come back in any
+        # order and are slotted by position so the output matches the serial run
+        with mp.Pool(processes, initializer=_init_worker, initargs=(self, return_tokens)) as pool:
+            for position, result in pool.imap_unordered(_tokenize_one, enumerate(text_files), chunksize=chunksize):
+                document_stats[position] = result
+        
+        return document_stats
+    
+    def _cache_settings(self) -> bytes:
+        return repr((
+            self.lowercase, self.remove_punctuation, self.min_length, self.remove_stopwords
+        )).encode()
+    
+    def _tokenize_files(self, text_files: List[Path], processes: int, return_tokens: bool) -> List[Dict]:
+        processes = processes or mp.cpu_count()
+        if processes > 1 and len(text_files) >= PARALLEL_MIN_DOCUMENTS:
+            return self._tokenize_documents_parallel(text_files, processes, return_tokens)
+        return [self.tokenize_document(doc_file, return_tokens) for doc_file in text_files]
+    
+    def _tokenize_files_cached(self, text_files: List[Path], cache: '_TokenCache', processes: int,
+                               return_tokens: bool) -> List[Dict]:
+        paths = [str(doc_file.resolve()) for doc_file in text_files]
+        digests = [cache.digest(doc_file) for doc_file in text_files]
+        cached = cache.get_many([(path, digest) for path, digest in zip(paths, digests) if digest is not None])
+        
+        document_stats = [None] * len(text_files)
+        for position, path in enumerate(paths):
+            if path in cached:
+                document_stats[position] = self._document_result(text_files[position], cached[path], return_tokens)
+        
+        pending = [position for position, result in enumerate(document_stats) if result is None]
+        results = self._tokenize_files([text_files[position] for position in pending], processes, return_tokens)
+        for position, result in zip(pending, results):
+            document_stats[position] = result
+        
+        cache.put_many(
+            (paths[position], digests[position], document_stats[position]['tokens']) for position in pending
+            if digests[position] is not None and 'error' not in document_stats[position]
+        )
+        return document_stats
+    
+    def tokenize_corpus(self, corpus_dir: Path, output_dir: Path = None, processes: int = None,
+                        return_tokens: bool = True, use_cache: bool = False) -> Dict:
         corpus_dir = Path(corpus_dir)
         if not corpus_dir.exists():
             return {'error': f'Corpus directory does not exist: {corpus_dir}'}
@@ -154,24 +371,36 @@ class Tokenizer:
         if not text_files:
             return {'error': f'No documents found in {corpus_dir}'}
         
-        all_tokens = []
-        all_vocabulary = set()
-        document_stats = []
+        # The per-document token files are written from the token lists
+        return_tokens = return_tokens or output_dir is not None
         
-        for doc_file in text_files:
-            result = self.tokenize_document(doc_file)
-            document_stats.append(result)
-            
-            if 'error' not in result:
-                all_tokens.extend(result['tokens'])
-                all_vocabulary.update(result['vocabulary'])
+        # Unchanged documents are read back from the output directory's
+        # cache instead of being tokenized again, when the caller asks for it
+        if output_dir is not None and use_cache:
+            output_dir = Path(output_dir)
+            output_dir.mkdir(parents=True, exist_ok=True)
+            with closing(_TokenCache(output_dir / TOKEN_CACHE_FILE, self._cache_settings())) as cache:
+                document_stats = self._tokenize_files_cached(text_files, cache, processes, return_tokens)
+        else:
+            document_stats = self._tokenize_files(text_files, processes, return_tokens)
         
-        corpus_frequencies = self.get_token_frequencies(all_tokens)
+        documents = [result for result in document_stats if 'error' not in result]
+        if return_tokens:
+            # Counting the concatenated tokens stays in Counter's C loop;
+            # merging per-document counters goes through Python per key
+            all_tokens = []
+            for result in documents:
+                all_tokens.extend(result['tokens'])
+            corpus_frequencies = self.get_token_frequencies(all_tokens)
+        else:
+            corpus_frequencies = Counter()
+            for result in documents:
+                corpus_frequencies.update(result['frequencies'])
         
         corpus_stats = {
             'total_documents': len(text_files),
-            'total_tokens': len(all_tokens),
-            'unique_tokens': len(all_vocabulary),
+            'total_tokens': sum(result['total_tokens'] for result in documents),
+            'unique_tokens': len(corpus_frequencies),
             'corpus_frequencies': corpus_frequencies,
             'document_stats': document_stats
         }
@@ -180,21 +409,17 @@ class Tokenizer:
             output_dir = Path(output_dir)
             output_dir.mkdir(parents=True, exist_ok=True)
 
-            stats_file = output_dir / 'corpus_tokenization_stats.json'
-            with open(stats_file, 'w', encoding='utf-8') as f:
-                json.dump(corpus_stats, f, ensure_ascii=False, indent=2)
+            _write_json(output_dir / 'corpus_tokenization_stats.json', corpus_stats)
 
             tokens_dir = output_dir / 'tokenized_documents'
             tokens_dir.mkdir(exist_ok=True)
             
             for doc_stat in document_stats:
                 if 'error' not in doc_stat:
-                    token_file = tokens_dir / f"{doc_stat['document_id']}_tokens.json"
-                    with open(token_file, 'w', encoding='utf-8') as f:
-                        json.dump({
-                            'document_id': doc_stat['document_id'],
-                            'tokens': doc_stat['tokens'],
-                            'frequencies': doc_stat['frequencies']
-                        }, f, ensure_ascii=False, indent=2)
+                    _write_json(tokens_dir / f"{doc_stat['document_id']}_tokens.json", {
+                        'document_id': doc_stat['document_id'],
+                        'tokens': doc_stat['tokens'],
+                        'frequencies': doc_stat['frequencies']
+                    })
         
         return corpus_stats
@@ -5,7 +5,7 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from tokenizer import Tokenizer
+from tokenizer import Tokenizer, clear_token_cache
 
 
 def main():
@@ -65,6 +65,16 @@ def main():
         action='store_true',
         help='Only output statistics, not token lists'
     )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Retokenize every document even if the output directory caches it'
+    )
+    parser.add_argument(
+        '--clear-cache',
+        action='store_true',
+        help="Empty the output directory's token cache before tokenizing"
+    )
     
     args = parser.parse_args()
     
@@ -86,7 +96,10 @@ def main():
         print(f"Output directory: {output_dir}")
         print("-" * 80)
         
-        stats = tokenizer.tokenize_corpus(input_path, output_dir)
+        if args.clear_cache:
+            clear_token_cache(output_dir)
+        
+        stats = tokenizer.tokenize_corpus(input_path, output_dir, use_cache=not args.no_cache)
         
         if 'error' in stats:
             print(f"Error: {stats['error']}")
@@ -1,4 +1,5 @@
 import json
+import pickle
 import time
 import logging
 import re
@@ -7,10 +8,50 @@ from pathlib import Path
 from typing import Dict, Optional, Set, List, Tuple
 from urllib.parse import urljoin, urlparse, urlunparse
 from urllib.robotparser import RobotFileParser
-from collections import deque
+from collections import deque, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 import requests
 from bs4 import BeautifulSoup
 
+try:
+    from pybloom_live import ScalableBloomFilter
+    HAS_BLOOM = True
+except ImportError:
+    HAS_BLOOM = False
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+    HAS_SELECTOLAX = True
+except ImportError:
+    HAS_SELECTOLAX = False
+
+
+_CHARSET_RE = re.compile(rb'charset=["\']?([\w-]+)', re.I)
+
+# http(s) scheme followed by a non-empty host, same as urlparse's scheme/netloc checks
+_CRAWLABLE_URL_RE = re.compile(r'https?://[^/?#]', re.I)
+_EXCLUDED_EXTENSIONS = (
+    '.pdf', '.doc', '.docx', '.zip', '.rar', '.exe', '.jpg', '.jpeg', '.png', '.gif', '.mp4', '.avi'
+)
+
+_STRIPPED_TAGS = ["script", "style", "nav", "header", "footer", "aside", "iframe"]
+
+_CONTENT_SELECTORS = [
+    'article',
+    '.article-content',
+    '.post-content',
+    '.entry-content',
+    '.content',
+    'main',
+    '.main-content',
+    '#content',
+    '.story-body',
+    '.article-body',
+    '.b-article__body',
+    '.article__text',
+    '.news-text'
+]
+
 
 class RobotsTxtParser:
     def __init__(self, user_agent: str = '*'):
@@ -53,6 +94,65 @@ class RobotsTxtParser:
         return self.crawl_delays.get(domain, 1.0)
 
 
+class VisitedUrls:
+
+    def __init__(self, initial_capacity: int = 1_000_000, error_rate: float = 1e-5,
+                 recent_size: int = 10000, use_bloom: bool = HAS_BLOOM):
+        self.use_bloom = use_bloom and HAS_BLOOM
+        self.recent_size = recent_size
+        # Exact cache of recently added URLs: the crawl loop re-checks fresh links
+        # far more often than old ones, and this skips hashing into the filter
+        self.recent: OrderedDict = OrderedDict()
+        
+        if self.use_bloom:
+            self.urls = ScalableBloomFilter(initial_capacity=initial_capacity, error_rate=error_rate)
+        else:
+            self.urls = set()
+    
+    def add(self, url: str):
+        self.urls.add(url)
+        self.recent[url] = None
+        self.recent.move_to_end(url)
+        if len(self.recent) > self.recent_size:
+            self.recent.popitem(last=False)
+    
+    def update(self, urls):
+        for url in urls:
+            self.add(url)
+    
+    def __contains__(self, url: str) -> bool:
+        return url in self.recent or url in self.urls
+    
+    def __len__(self) -> int:
+        return len(self.urls)
+    
+    def save(self, path: Path):
+        with open(path, 'wb') as f:
+            if self.use_bloom:
+                self.urls.tofile(f)
+            else:
+                pickle.dump(self.urls, f, protocol=pickle.HIGHEST_PROTOCOL)
+    
+    def load(self, path: Path, bloom: bool = None):
+        # bloom tells which backend wrote the file, when that may not be the
+        # current one: a pickled set is added into a filter, but a filter
+        # cannot be read back as a set
+        if bloom is None:
+            bloom = self.use_bloom
+        if bloom and not self.use_bloom:
+            raise ValueError(f"{path} holds a Bloom filter and pybloom_live is not installed")
+        
+        with open(path, 'rb') as f:
+            if bloom:
+                self.urls = ScalableBloomFilter.fromfile(f)
+            elif self.use_bloom:
+                for url in pickle.load(f):
+                    self.urls.add(url)
+            else:
+                self.urls = pickle.load(f)
+        self.recent.clear()
+
+
 class WebCrawler:
 
     def __init__(self, output_dir: str = "corpus/crawled", user_agent: str = "InfoSearchBot/1.0"):
@@ -65,10 +165,11 @@ class WebCrawler:
         self._setup_logging()
         
         self.state_file = self.output_dir / '.crawler_state.json'
+        self.visited_file = self.output_dir / '.crawler_visited.bloom'
+        self.visited_set_file = self.output_dir / '.crawler_visited.pkl'
         self._load_state()
         
         self.url_queue: deque = deque()
-        self.visited_urls: Set[str] = set()
         self.failed_urls: Set[str] = set()
         
         self.stats = {
@@ -93,6 +194,7 @@ class WebCrawler:
         self.max_depth = 3
         self.max_pages_per_domain = 100
         self.min_content_length = 500
+        self.parse_workers = 0
         self.domain_page_counts: Dict[str, int] = {}
     
     def _create_session(self) -> requests.Session:
@@ -136,14 +238,24 @@ class WebCrawler:
     
     def _load_state(self):
         self.last_doc_id = 0
-        self.visited_urls = set()
+        self.visited_urls = VisitedUrls()
+        
+        # Either file may predate installing or removing pybloom_live; the
+        # filter is read first so that a pickled set is merged into it
+        for visited_file, bloom in ((self.visited_file, True), (self.visited_set_file, False)):
+            if visited_file.exists():
+                try:
+                    self.visited_urls.load(visited_file, bloom)
+                except Exception as e:
+                    logging.warning(f"Error loading visited URLs, they may be crawled again: {e}")
         
         if self.state_file.exists():
             try:
                 with open(self.state_file, 'r', encoding='utf-8') as f:
                     state = json.load(f)
                     self.last_doc_id = state.get('last_doc_id', 0)
-                    self.visited_urls = set(state.get('visited_urls', []))
+                    # Older state files kept the visited URLs inline
+                    self.visited_urls.update(state.get('visited_urls', []))
                 logging.info(f"Loaded state: {len(self.visited_urls)} visited URLs, last doc ID: {self.last_doc_id}")
             except Exception as e:
                 logging.warning(f"Error loading state file: {e}")
@@ -164,19 +276,29 @@ class WebCrawler:
                     self.last_doc_id = max_id
                     logging.info(f"Found existing documents, last doc ID: {self.last_doc_id}")
     
+    def _visited_path(self) -> Path:
+        return self.visited_file if self.visited_urls.use_bloom else self.visited_set_file
+    
     def _save_state(self):
         try:
             state = {
                 'last_doc_id': self.last_doc_id,
-                'visited_urls': list(self.visited_urls),
+                'visited_count': len(self.visited_urls),
                 'last_updated': datetime.now().isoformat()
             }
+            # The URL set is pickled rather than listed in the JSON: it is the
+            # bulk of the state and loads back as a set without re-parsing
+            self.visited_urls.save(self._visited_path())
+            if self.visited_urls.use_bloom:
+                # Its URLs were merged into the filter on load
+                self.visited_set_file.unlink(missing_ok=True)
             with open(self.state_file, 'w', encoding='utf-8') as f:
                 json.dump(state, f, ensure_ascii=False, indent=2)
         except Exception as e:
             logging.warning(f"Error saving state file: {e}")
     
-    def _normalize_url(self, url: str, base_url: str = None) -> str:
+    @staticmethod
+    def _normalize_url(url: str, base_url: str = None) -> str:
         if not url:
             return ""
         
@@ -195,41 +317,43 @@ class WebCrawler:
         
         return normalized
     
-    def _is_valid_url(self, url: str) -> bool:
-        parsed = urlparse(url)
-        
-        if not parsed.scheme or parsed.scheme not in ['http', 'https']:
+    @staticmethod
+    def _is_valid_url(url: str) -> bool:
+        if not _CRAWLABLE_URL_RE.match(url):
             return False
         
-        if not parsed.netloc:
-            return False
-        
-        excluded_extensions = ['.pdf', '.doc', '.docx', '.zip', '.rar', '.exe', '.jpg', '.jpeg', '.png', '.gif', '.mp4', '.avi']
-        if any(url.lower().endswith(ext) for ext in excluded_extensions):
-            return False
-        
-        return True
+        return not url.lower().endswith(_EXCLUDED_EXTENSIONS)
     
-    def _extract_links(self, html_content: str, base_url: str) -> List[str]:
+    @classmethod
+    def _extract_links(cls, html_content: str, base_url: str) -> List[str]:
         links = []
         try:
-            soup = BeautifulSoup(html_content, 'lxml')
-            for link in soup.find_all('a', href=True):
-                href = link.get('href', '')
+            if HAS_SELECTOLAX:
+                tree = LexborHTMLParser(html_content)
+                hrefs = [node.attributes.get('href') for node in tree.css('a[href]')]
+            else:
+                soup = BeautifulSoup(html_content, 'lxml')
+                hrefs = [link.get('href', '') for link in soup.find_all('a', href=True)]
+            
+            for href in hrefs:
                 if href:
-                    full_url = self._normalize_url(href, base_url)
-                    if full_url and self._is_valid_url(full_url):
+                    full_url = cls._normalize_url(href, base_url)
+                    if full_url and cls._is_valid_url(full_url):
                         links.append(full_url)
         except Exception as e:
             logging.warning(f"Error extracting links from {base_url}: {e}")
         
         return links
     
-    def _extract_content(self, html_content: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+    @staticmethod
+    def _extract_content(html_content: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
         try:
+            if HAS_SELECTOLAX:
+                return WebCrawler._extract_content_lexbor(html_content)
+            
             soup = BeautifulSoup(html_content, 'lxml')
             
-            for script in soup(["script", "style", "nav", "header", "footer", "aside", "iframe"]):
+            for script in soup(_STRIPPED_TAGS):
                 script.decompose()
             
             title = None
@@ -237,24 +361,8 @@ class WebCrawler:
             if title_elem:
                 title = title_elem.get_text().strip()
             
-            content_selectors = [
-                'article',
-                '.article-content',
-                '.post-content',
-                '.entry-content',
-                '.content',
-                'main',
-                '.main-content',
-                '#content',
-                '.story-body',
-                '.article-body',
-                '.b-article__body',
-                '.article__text',
-                '.news-text'
-            ]
-            
             text_content = None
-            for selector in content_selectors:
+            for selector in _CONTENT_SELECTORS:
                 elements = soup.select(selector)
                 if elements:
                     largest = max(elements, key=lambda x: len(x.get_text()))
@@ -281,11 +389,55 @@ class WebCrawler:
             logging.warning(f"Error extracting content: {e}")
             return None, None, None
     
+    @staticmethod
+    def _extract_content_lexbor(html_content: str) -> Tuple[Optional[str], Optional[str], Optional[str]]:
+        # Same rules as the BeautifulSoup path, on selectolax's C (Lexbor) tree
+        tree = LexborHTMLParser(html_content)
+        tree.strip_tags(_STRIPPED_TAGS)
+        
+        title = None
+        title_elem = tree.css_first('title') or tree.css_first('h1')
+        if title_elem:
+            title = title_elem.text().strip()
+        
+        text_content = None
+        for selector in _CONTENT_SELECTORS:
+            elements = tree.css(selector)
+            if elements:
+                text_content = max((element.text() for element in elements), key=len)
+                break
+        
+        if not text_content and tree.body is not None:
+            text_content = tree.body.text()
+        
+        if text_content:
+            text_content = ' '.join(text_content.split())
+        
+        date_str = None
+        date_elem = tree.css_first('time') or tree.css_first('[class*="date"], [class*="time"]')
+        if date_elem:
+            date_str = date_elem.attributes.get('datetime') or date_elem.text()
+        
+        return title, text_content, date_str
+    
+    def _detect_encoding(self, response: requests.Response) -> str:
+        content_type = response.headers.get('Content-Type', '')
+        if 'charset=' in content_type.lower() and response.encoding:
+            return response.encoding
+
+        # requests falls back to ISO-8859-1 when the header has no charset,
+        # so check <meta charset> before paying for chardet on the whole body
+        match = _CHARSET_RE.search(response.content[:2048])
+        if match:
+            return match.group(1).decode('ascii', 'ignore')
+
+        return response.apparent_encoding or 'utf-8'
+    
     def _fetch_url(self, url: str, timeout: int = 30) -> Optional[str]:
         try:
             response = self.session.get(url, timeout=timeout)
             response.raise_for_status()
-            response.encoding = response.apparent_encoding or 'utf-8'
+            response.encoding = self._detect_encoding(response)
             return response.text
         except Exception as e:
             logging.warning(f"Error fetching {url}: {e}")
@@ -296,15 +448,17 @@ class WebCrawler:
             parsed = urlparse(url)
             source = parsed.netloc
             
+            # Each file is assembled in memory and written with a single call
             text_file = self.output_dir / f"doc_{doc_id:08d}.txt"
-            with open(text_file, 'w', encoding='utf-8') as f:
-                f.write(f"TITLE: {title or 'Untitled'}\n")
-                f.write(f"SOURCE: {source}\n")
-                f.write(f"URL: {url}\n")
-                f.write(f"DATE: {date or ''}\n")
-                f.write("-" * 80 + "\n")
-                f.write("CONTENT:\n")
-                f.write(content)
+            text_file.write_bytes((
+                f"TITLE: {title or 'Untitled'}\n"
+                f"SOURCE: {source}\n"
+                f"URL: {url}\n"
+                f"DATE: {date or ''}\n"
+                + "-" * 80 + "\n"
+                "CONTENT:\n"
+                + content
+            ).encode('utf-8'))
             
             meta_file = self.output_dir / f"doc_{doc_id:08d}.meta.json"
             meta_data = {
@@ -315,8 +469,7 @@ class WebCrawler:
                 'text': content,
                 'type': 'crawled_web_page'
             }
-            with open(meta_file, 'w', encoding='utf-8') as f:
-                json.dump(meta_data, f, ensure_ascii=False, indent=2)
+            meta_file.write_bytes(json.dumps(meta_data, ensure_ascii=False, indent=2).encode('utf-8'))
             
             return True
         except Exception as e:
@@ -327,6 +480,24 @@ class WebCrawler:
         parsed = urlparse(url)
         return parsed.netloc
     
+    def _handle_page(self, url: str, title: Optional[str], text_content: Optional[str],
+                     date_str: Optional[str], links: List[str], depth: int) -> bool:
+        saved = False
+        if text_content and len(text_content) >= self.min_content_length:
+            doc_id = self.last_doc_id + 1
+            if self._save_document(doc_id, url, title or 'Untitled', text_content, date_str):
+                self.last_doc_id = doc_id
+                self.stats['documents_saved'] += 1
+                saved = True
+        
+        for link in links:
+            normalized_link = self._normalize_url(link)
+            if normalized_link and normalized_link not in self.visited_urls:
+                if normalized_link not in [item[0] for item in self.url_queue]:
+                    self.url_queue.append((normalized_link, depth + 1))
+        
+        return saved
+    
     def crawl(self, seed_urls: List[str], max_pages: int = 100, max_depth: int = 3) -> Dict:
         logging.info(f"Starting crawl with {len(seed_urls)} seed URLs")
         
@@ -339,60 +510,64 @@ class WebCrawler:
         
         pages_crawled = 0
         
-        while self.url_queue and pages_crawled < max_pages:
-            if not self.url_queue:
-                break
-            
-            url, depth = self.url_queue.popleft()
-            
-            if url in self.visited_urls:
-                continue
-            
-            if depth > self.max_depth:
-                continue
-            
-            domain = self._get_domain(url)
-            if self.domain_page_counts.get(domain, 0) >= self.max_pages_per_domain:
-                continue
-            
-            if not self.robots_parser.can_fetch(url):
-                logging.debug(f"Skipping {url} (robots.txt)")
-                self.stats['urls_skipped'] += 1
-                continue
-            
-            self.visited_urls.add(url)
-            self.stats['urls_visited'] += 1
-            self.domain_page_counts[domain] = self.domain_page_counts.get(domain, 0) + 1
-            
-            crawl_delay = self.robots_parser.get_crawl_delay(url)
-            time.sleep(crawl_delay)
-            
-            html_content = self._fetch_url(url)
-            if not html_content:
-                self.failed_urls.add(url)
-                self.stats['urls_failed'] += 1
-                continue
-            
-            title, text_content, date_str = self._extract_content(html_content)
-            
-            if text_content and len(text_content) >= self.min_content_length:
-                doc_id = self.last_doc_id + 1
-                if self._save_document(doc_id, url, title or 'Untitled', text_content, date_str):
-                    self.last_doc_id = doc_id
-                    self.stats['documents_saved'] += 1
+        # Parsing in worker processes overlaps with fetching (and the crawl delay)
+        # of the next URL; pages are still handled in fetch order
+        pool = ProcessPoolExecutor(max_workers=self.parse_workers) if self.parse_workers > 0 else None
+        pending: deque = deque()
+        
+        try:
+            while (self.url_queue or pending) and pages_crawled < max_pages:
+                if pending and (not self.url_queue or len(pending) >= self.parse_workers
+                                or pages_crawled + len(pending) >= max_pages
+                                or pending[0][0].done()):
+                    future, url, depth = pending.popleft()
+                    parsed = future.result()
+                else:
+                    url, depth = self.url_queue.popleft()
+                    
+                    if url in self.visited_urls:
+                        continue
+                    
+                    if depth > self.max_depth:
+                        continue
+                    
+                    domain = self._get_domain(url)
+                    if self.domain_page_counts.get(domain, 0) >= self.max_pages_per_domain:
+                        continue
+                    
+                    if not self.robots_parser.can_fetch(url):
+                        logging.debug(f"Skipping {url} (robots.txt)")
+                        self.stats['urls_skipped'] += 1
+                        continue
+                    
+                    self.visited_urls.add(url)
+                    self.stats['urls_visited'] += 1
+                    self.domain_page_counts[domain] = self.domain_page_counts.get(domain, 0) + 1
+                    
+                    crawl_delay = self.robots_parser.get_crawl_delay(url)
+                    time.sleep(crawl_delay)
+                    
+                    html_content = self._fetch_url(url)
+                    if not html_content:
+                        self.failed_urls.add(url)
+                        self.stats['urls_failed'] += 1
+                        continue
+                    
+                    with_links = depth < self.max_depth
+                    if pool is not None:
+                        pending.append((pool.submit(_parse_page, html_content, url, with_links), url, depth))
+                        continue
+                    parsed = _parse_page(html_content, url, with_links)
+                
+                if self._handle_page(url, *parsed, depth):
                     pages_crawled += 1
                     
                     if pages_crawled % 10 == 0:
                         self._save_state()
                         logging.info(f"Crawled {pages_crawled} pages, saved {self.stats['documents_saved']} documents")
-            
-            if depth < self.max_depth:
-                links = self._extract_links(html_content, url)
-                for link in links:
-                    normalized_link = self._normalize_url(link)
-                    if normalized_link and normalized_link not in self.visited_urls:
-                        if normalized_link not in [item[0] for item in self.url_queue]:
-                            self.url_queue.append((normalized_link, depth + 1))
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
         
         self._save_state()
         
@@ -405,3 +580,9 @@ class WebCrawler:
     
     def get_statistics(self) -> Dict:
         return self.stats.copy()
+
+
+def _parse_page(html_content: str, url: str, with_links: bool) -> Tuple[Optional[str], Optional[str], Optional[str], List[str]]:
+    title, text_content, date_str = WebCrawler._extract_content(html_content)
+    links = WebCrawler._extract_links(html_content, url) if with_links else []
+    return title, text_content, date_str, links
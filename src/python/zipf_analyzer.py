@@ -1,232 +1,390 @@
 import json
-import math
-from typing import List, Dict, Tuple
+import threading
+from typing import List, Dict, Tuple, Iterable, Optional, Union, BinaryIO
 from pathlib import Path
 from collections import Counter
 
+import numpy as np
+
+from zipf_kernels import zipf_stats
+
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
 try:
     import matplotlib
     matplotlib.use('Agg')
-    import matplotlib.pyplot as plt
-    import numpy as np
+    from matplotlib.figure import Figure
     HAS_MATPLOTLIB = True
 except ImportError:
     HAS_MATPLOTLIB = False
 
 
+# Building a Figure and its canvas is the expensive part of a plot call, so a
+# single figure is cleared and reused; the lock keeps concurrent requests apart
+_FIGURE = None
+_FIGURE_LOCK = threading.Lock()
+
+
+def _get_figure(size: Tuple[float, float]) -> 'Figure':
+    global _FIGURE
+    if _FIGURE is None:
+        _FIGURE = Figure(figsize=size)
+    else:
+        _FIGURE.clear()
+        _FIGURE.set_size_inches(*size)
+    return _FIGURE
+
+
+# Layout of save_ranking archives; bump whenever it changes
+RANKING_FORMAT = 2
+
+
 class ZipfAnalyzer:
 
     def __init__(self):
-        self.frequencies = {}
-        self.ranked_frequencies = []
+        self.reset()
+    
+    def reset(self):
+        self.frequencies = Counter()
         self.total_tokens = 0
         self.unique_tokens = 0
+        self._reset_ranking()
+    
+    def _reset_ranking(self):
+        # Ranking is kept as parallel arrays; row i describes rank i + 1
+        self.tokens: List[str] = []
+        self.ranks = np.empty(0, dtype=np.int64)
+        self.freqs = np.empty(0, dtype=np.int64)
+        self.rel_freqs = np.empty(0, dtype=np.float64)
+        self.predicted = np.empty(0, dtype=np.float64)
+        self._inv_rank = np.empty(0, dtype=np.float64)
+        self._ranked = False
+        self._zipf_constant = None
+        self.ranked_frequencies = []
     
     def calculate_frequencies(self, tokens: List[str]) -> Dict[str, int]:
+        self._reset_ranking()
         self.frequencies = Counter(tokens)
         self.total_tokens = len(tokens)
         self.unique_tokens = len(self.frequencies)
         
         return dict(self.frequencies)
     
+    def calculate_frequencies_from_docs(self, docs: Iterable[List[str]]) -> Dict[str, int]:
+        self._reset_ranking()
+        frequencies = Counter()
+        total = 0
+        for tokens in docs:
+            frequencies.update(tokens)
+            total += len(tokens)
+        
+        self.frequencies = frequencies
+        self.total_tokens = total
+        self.unique_tokens = len(frequencies)
+        
+        return dict(self.frequencies)
+    
+    def _rank(self):
+        sorted_items = self.frequencies.most_common()
+        
+        self._set_ranking(
+            [token for token, _ in sorted_items],
+            np.fromiter((freq for _, freq in sorted_items), dtype=np.int64, count=len(sorted_items))
+        )
+    
+    def _set_ranking(self, tokens: List[str], freqs: np.ndarray):
+        self.tokens = tokens
+        self.freqs = freqs
+        self.ranks = np.arange(1, self.freqs.size + 1, dtype=np.int64)
+        self.rel_freqs = self.freqs / max(self.total_tokens, 1)
+        # 1/rank is divided once; predictions for any constant are a multiply
+        self._inv_rank = np.reciprocal(self.ranks.astype(np.float64))
+        self._ranked = True
+        self._zipf_constant = int(self.freqs[0]) if self.freqs.size else 0.0
+        self.ranked_frequencies = []
+        self.predicted = self.zipf_predicted_array()
+    
+    def _ensure_ranked(self):
+        if not self._ranked:
+            self._rank()
+    
     def get_ranked_frequencies(self) -> List[Tuple[int, str, int, float]]:
         if not self.frequencies:
             return []
 
-        sorted_items = sorted(self.frequencies.items(), key=lambda x: x[1], reverse=True)
-        
-        self.ranked_frequencies = []
-        for rank, (token, freq) in enumerate(sorted_items, start=1):
-            relative_freq = freq / self.total_tokens if self.total_tokens > 0 else 0
-            self.ranked_frequencies.append((rank, token, freq, relative_freq))
+        # Built once per ranking; recounting or loading resets it
+        if not self.ranked_frequencies:
+            self._ensure_ranked()
+            self.ranked_frequencies = list(zip(
+                self.ranks.tolist(), self.tokens, self.freqs.tolist(), self.rel_freqs.tolist()
+            ))
         
         return self.ranked_frequencies
     
+    def save_ranking(self, path: Path):
+        self._ensure_ranked()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # One UTF-8 blob sliced by byte offsets: a fixed-width unicode array
+        # would pad every token to the longest one, and untokenized text can
+        # put any character, NUL included, inside a token
+        encoded = [token.encode('utf-8') for token in self.tokens]
+        token_offs = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum(np.fromiter(map(len, encoded), dtype=np.int64, count=len(encoded)), out=token_offs[1:])
+        np.savez_compressed(
+            path,
+            tokens=np.frombuffer(b''.join(encoded), dtype=np.uint8),
+            token_offs=token_offs,
+            freqs=self.freqs,
+            total_tokens=np.int64(self.total_tokens)
+        )
+    
+    def load_ranking(self, path: Path):
+        with np.load(path) as data:
+            tokens_blob = data['tokens'].tobytes()
+            bounds = data['token_offs'].tolist()
+            freqs = data['freqs'].astype(np.int64)
+            total_tokens = int(data['total_tokens'])
+        
+        tokens = [tokens_blob[bounds[i]:bounds[i + 1]].decode('utf-8') for i in range(len(bounds) - 1)]
+        
+        self._reset_ranking()
+        self.frequencies = Counter(dict(zip(tokens, freqs.tolist())))
+        self.total_tokens = total_tokens
+        self.unique_tokens = len(tokens)
+        self._set_ranking(tokens, freqs)
+    
+    def _top_k(self, k: int) -> List[Tuple[str, int]]:
+        # heapq.nlargest under the hood: O(V log k) instead of a full sort
+        return self.frequencies.most_common(k)
+    
     def calculate_zipf_constant(self) -> float:
-        if not self.ranked_frequencies:
-            self.get_ranked_frequencies()
-        
-        if not self.ranked_frequencies:
-            return 0.0
+        if self._zipf_constant is None:
+            top = self._top_k(1)
+            self._zipf_constant = top[0][1] if top else 0.0
 
-        rank, token, freq, _ = self.ranked_frequencies[0]
-        return freq * rank
+        return self._zipf_constant
     
-    def calculate_zipf_predicted(self, rank: int, constant: float = None) -> float:
+    def calculate_zipf_predicted(self, rank, constant: float = None):
         if constant is None:
             constant = self.calculate_zipf_constant()
         
+        if isinstance(rank, np.ndarray):
+            return self._predicted_array(rank, constant)
+        
         if constant == 0 or rank == 0:
             return 0.0
         
         return constant / rank
     
-    def calculate_correlation(self) -> float:
-        if not self.ranked_frequencies:
-            self.get_ranked_frequencies()
+    def zipf_predicted_array(self, stop: int = None, constant: float = None) -> np.ndarray:
+        self._ensure_ranked()
+        if constant is None:
+            constant = self.calculate_zipf_constant()
         
-        if len(self.ranked_frequencies) < 2:
-            return 0.0
+        return constant * self._inv_rank[:stop]
+    
+    def _predicted_array(self, ranks: np.ndarray, constant: float = None) -> np.ndarray:
+        if constant is None:
+            constant = self.calculate_zipf_constant()
         
-        constant = self.calculate_zipf_constant()
+        predicted = np.zeros(ranks.shape, dtype=np.float64)
+        if constant:
+            np.divide(constant, ranks, out=predicted, where=ranks != 0)
+        return predicted
+    
+    def calculate_correlation(self) -> float:
+        self._ensure_ranked()
         
-        actual_freqs = [freq for _, _, freq, _ in self.ranked_frequencies]
-        predicted_freqs = [self.calculate_zipf_predicted(rank, constant) 
-                          for rank, _, _, _ in self.ranked_frequencies]
-
-        n = len(actual_freqs)
-        if n < 2:
+        if self.freqs.size < 2:
             return 0.0
         
-        mean_actual = sum(actual_freqs) / n
-        mean_predicted = sum(predicted_freqs) / n
-        
-        numerator = sum((a - mean_actual) * (p - mean_predicted) 
-                       for a, p in zip(actual_freqs, predicted_freqs))
-        
-        sum_sq_actual = sum((a - mean_actual) ** 2 for a in actual_freqs)
-        sum_sq_predicted = sum((p - mean_predicted) ** 2 for p in predicted_freqs)
-        
-        denominator = math.sqrt(sum_sq_actual * sum_sq_predicted)
+        _, correlation = zipf_stats(self.freqs, self.predicted)
+        return float(correlation)
+    
+    def _rank_records(self, stop: int = None) -> List[Dict]:
+        self._ensure_ranked()
+        return [
+            {'rank': rank, 'token': token, 'frequency': freq, 'relative_frequency': rel_freq}
+            for rank, token, freq, rel_freq in zip(
+                self.ranks[:stop].tolist(), self.tokens[:stop],
+                self.freqs[:stop].tolist(), self.rel_freqs[:stop].tolist()
+            )
+        ]
+    
+    def _top_words(self, k: int) -> List[Dict]:
+        if self._ranked:
+            return self._rank_records(k)
+        
+        total = max(self.total_tokens, 1)
+        return [
+            {'rank': rank, 'token': token, 'frequency': freq, 'relative_frequency': freq / total}
+            for rank, (token, freq) in enumerate(self._top_k(k), start=1)
+        ]
+    
+    def get_summary_statistics(self, include_correlation: bool = False) -> Dict:
+        # Top words and the constant come from most_common(k); only the
+        # correlation needs the full ranking
+        stats = {
+            'total_tokens': self.total_tokens,
+            'unique_tokens': self.unique_tokens,
+            'zipf_constant': self.calculate_zipf_constant(),
+            'top_words': self._top_words(10)
+        }
         
-        if denominator == 0:
-            return 0.0
+        if include_correlation:
+            stats['correlation'] = self.calculate_correlation()
         
-        return numerator / denominator
+        return stats
     
-    def get_statistics(self) -> Dict:
-        if not self.ranked_frequencies:
-            self.get_ranked_frequencies()
-        
+    def get_statistics(self, include_all_ranks: bool = False) -> Dict:
+        return self.get_full_statistics(include_all_ranks)
+    
+    def get_full_statistics(self, include_all_ranks: bool = False) -> Dict:
+        # One dict per vocabulary entry: only build them when asked for, and
+        # then let top_words alias the first ten instead of rebuilding them
+        records = self._rank_records() if include_all_ranks else None
+        top_words = records[:10] if records is not None else self._top_words(10)
         constant = self.calculate_zipf_constant()
         correlation = self.calculate_correlation()
-
-        top_words = [
-            {'rank': rank, 'token': token, 'frequency': freq, 'relative_frequency': rel_freq}
-            for rank, token, freq, rel_freq in self.ranked_frequencies[:10]
-        ]
         
-        return {
+        stats = {
             'total_tokens': self.total_tokens,
             'unique_tokens': self.unique_tokens,
             'zipf_constant': constant,
             'correlation': correlation,
-            'top_words': top_words,
-            'ranked_frequencies': [
-                {'rank': rank, 'token': token, 'frequency': freq, 'relative_frequency': rel_freq}
-                for rank, token, freq, rel_freq in self.ranked_frequencies
-            ]
+            'top_words': top_words
         }
-    
-    def plot_zipf_law(self, output_path: Path = None, max_rank: int = 1000) -> str:
-        if not HAS_MATPLOTLIB:
-            raise ImportError("matplotlib is required for plotting")
-        
-        if not self.ranked_frequencies:
-            self.get_ranked_frequencies()
-        
-        if not self.ranked_frequencies:
-            raise ValueError("No data to plot")
-
-        data = self.ranked_frequencies[:max_rank]
         
-        ranks = [rank for rank, _, _, _ in data]
-        frequencies = [freq for _, _, freq, _ in data]
-        constant = self.calculate_zipf_constant()
-        predicted = [self.calculate_zipf_predicted(rank, constant) for rank in ranks]
-
-        plt.figure(figsize=(12, 8))
-
-        plt.loglog(ranks, frequencies, 'b-', alpha=0.7, linewidth=2, label='Actual frequencies')
-
-        plt.loglog(ranks, predicted, 'r--', alpha=0.7, linewidth=2, label="Zipf's Law prediction")
+        if records is not None:
+            stats['ranked_frequencies'] = records
         
-        plt.xlabel('Rank (log scale)', fontsize=12)
-        plt.ylabel('Frequency (log scale)', fontsize=12)
-        plt.title("Zipf's Law Analysis", fontsize=14, fontweight='bold')
-        plt.legend(fontsize=10)
-        plt.grid(True, alpha=0.3)
-
-        stats_text = f'Total tokens: {self.total_tokens:,}\n'
-        stats_text += f'Unique tokens: {self.unique_tokens:,}\n'
-        stats_text += f'Zipf constant: {constant:.2f}\n'
-        stats_text += f'Correlation: {self.calculate_correlation():.4f}'
+        return stats
+    
+    def save_statistics(self, stats: Dict, output_path: Path):
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        plt.text(0.02, 0.98, stats_text, transform=plt.gca().transAxes,
-                fontsize=9, verticalalignment='top',
-                bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+        if HAS_ORJSON:
+            with open(output_path, 'wb') as f:
+                f.write(orjson.dumps(stats, option=orjson.OPT_INDENT_2))
+        else:
+            with open(output_path, 'w', encoding='utf-8') as f:
+                json.dump(stats, f, ensure_ascii=False, indent=2)
+    
+    def _save_plot(self, fig: 'Figure', output_path, default_path: str, dpi: int,
+                   fmt: str = 'png') -> Optional[str]:
+        # File-like outputs (e.g. io.BytesIO) get the image bytes, nothing touches disk
+        if hasattr(output_path, 'write'):
+            fig.savefig(output_path, format=fmt, dpi=dpi, bbox_inches='tight')
+            return None
         
-        plt.tight_layout()
-
         if output_path is None:
-            output_path = Path('zipf_plot.png')
+            output_path = Path(default_path)
         else:
             output_path = Path(output_path)
             output_path.parent.mkdir(parents=True, exist_ok=True)
         
-        plt.savefig(output_path, dpi=150, bbox_inches='tight')
-        plt.close()
+        fig.savefig(output_path, dpi=dpi, bbox_inches='tight')
         
         return str(output_path)
     
-    def plot_rank_frequency(self, output_path: Path = None, max_rank: int = 100) -> str:
+    def plot_zipf_law(self, output_path: Union[Path, BinaryIO] = None, max_rank: int = 1000,
+                      dpi: int = 150, max_points: int = 200, fmt: str = 'png') -> Optional[str]:
         if not HAS_MATPLOTLIB:
             raise ImportError("matplotlib is required for plotting")
         
-        if not self.ranked_frequencies:
-            self.get_ranked_frequencies()
+        self._ensure_ranked()
         
-        if not self.ranked_frequencies:
+        if self.freqs.size == 0:
             raise ValueError("No data to plot")
 
-        data = self.ranked_frequencies[:max_rank]
-        
-        ranks = [rank for rank, _, _, _ in data]
-        frequencies = [freq for _, _, freq, _ in data]
+        # On log-log axes evenly log-spaced ranks look the same as every rank
+        n = min(max_rank, self.freqs.size)
+        if n > max_points:
+            points = np.unique(np.logspace(0, np.log10(n), max_points).astype(np.int64) - 1)
+        else:
+            points = slice(0, n)
+
+        ranks = self.ranks[points]
+        frequencies = self.freqs[points]
+        predicted = self.predicted[points]
         constant = self.calculate_zipf_constant()
-        predicted = [self.calculate_zipf_predicted(rank, constant) for rank in ranks]
 
-        plt.figure(figsize=(12, 6))
-        
-        plt.plot(ranks, frequencies, 'b-o', markersize=4, alpha=0.7, label='Actual frequencies')
-        plt.plot(ranks, predicted, 'r--', linewidth=2, alpha=0.7, label="Zipf's Law prediction")
-        
-        plt.xlabel('Rank', fontsize=12)
-        plt.ylabel('Frequency', fontsize=12)
-        plt.title(f"Zipf's Law: Top {max_rank} Words", fontsize=14, fontweight='bold')
-        plt.legend(fontsize=10)
-        plt.grid(True, alpha=0.3)
-        
-        plt.tight_layout()
+        stats_text = f'Total tokens: {self.total_tokens:,}\n'
+        stats_text += f'Unique tokens: {self.unique_tokens:,}\n'
+        stats_text += f'Zipf constant: {constant:.2f}\n'
+        stats_text += f'Correlation: {self.calculate_correlation():.4f}'
 
-        if output_path is None:
-            output_path = Path('zipf_rank_frequency.png')
-        else:
-            output_path = Path(output_path)
-            output_path.parent.mkdir(parents=True, exist_ok=True)
+        with _FIGURE_LOCK:
+            fig = _get_figure((12, 8))
+            ax = fig.add_subplot(111)
+
+            ax.loglog(ranks, frequencies, 'b-', alpha=0.7, linewidth=2, label='Actual frequencies')
+
+            ax.loglog(ranks, predicted, 'r--', alpha=0.7, linewidth=2, label="Zipf's Law prediction")
+            
+            ax.set_xlabel('Rank (log scale)', fontsize=12)
+            ax.set_ylabel('Frequency (log scale)', fontsize=12)
+            ax.set_title("Zipf's Law Analysis", fontsize=14, fontweight='bold')
+            ax.legend(fontsize=10)
+            ax.grid(True, alpha=0.3)
+            
+            ax.text(0.02, 0.98, stats_text, transform=ax.transAxes,
+                    fontsize=9, verticalalignment='top',
+                    bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.5))
+            
+            fig.tight_layout()
+
+            return self._save_plot(fig, output_path, 'zipf_plot.png', dpi, fmt)
+    
+    def plot_rank_frequency(self, output_path: Union[Path, BinaryIO] = None, max_rank: int = 100,
+                            dpi: int = 150, fmt: str = 'png') -> Optional[str]:
+        if not HAS_MATPLOTLIB:
+            raise ImportError("matplotlib is required for plotting")
         
-        plt.savefig(output_path, dpi=150, bbox_inches='tight')
-        plt.close()
+        self._ensure_ranked()
         
-        return str(output_path)
-    
-    def analyze_corpus(self, corpus_tokens: Dict[str, List[str]], output_dir: Path = None) -> Dict:
-        all_tokens = []
-        for tokens in corpus_tokens.values():
-            all_tokens.extend(tokens)
+        if self.freqs.size == 0:
+            raise ValueError("No data to plot")
 
-        self.calculate_frequencies(all_tokens)
-        self.get_ranked_frequencies()
+        ranks = self.ranks[:max_rank]
+        frequencies = self.freqs[:max_rank]
+        predicted = self.zipf_predicted_array(max_rank)
 
-        stats = self.get_statistics()
+        with _FIGURE_LOCK:
+            fig = _get_figure((12, 6))
+            ax = fig.add_subplot(111)
+            
+            ax.plot(ranks, frequencies, 'b-o', markersize=4, alpha=0.7, label='Actual frequencies')
+            ax.plot(ranks, predicted, 'r--', linewidth=2, alpha=0.7, label="Zipf's Law prediction")
+            
+            ax.set_xlabel('Rank', fontsize=12)
+            ax.set_ylabel('Frequency', fontsize=12)
+            ax.set_title(f"Zipf's Law: Top {max_rank} Words", fontsize=14, fontweight='bold')
+            ax.legend(fontsize=10)
+            ax.grid(True, alpha=0.3)
+            
+            fig.tight_layout()
+
+            return self._save_plot(fig, output_path, 'zipf_rank_frequency.png', dpi, fmt)
+    
+    def analyze_corpus(self, corpus_tokens: Dict[str, List[str]], output_dir: Path = None,
+                       include_all_ranks: bool = False) -> Dict:
+        self.calculate_frequencies_from_docs(corpus_tokens.values())
+        self._ensure_ranked()
+
+        stats = self.get_statistics(include_all_ranks)
 
         if output_dir:
             output_dir = Path(output_dir)
             output_dir.mkdir(parents=True, exist_ok=True)
 
-            stats_file = output_dir / 'zipf_statistics.json'
-            with open(stats_file, 'w', encoding='utf-8') as f:
-                json.dump(stats, f, ensure_ascii=False, indent=2)
+            self.save_statistics(stats, output_dir / 'zipf_statistics.json')
 
             try:
                 plot1 = self.plot_zipf_law(output_dir / 'zipf_law_plot.png')
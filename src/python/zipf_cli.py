@@ -1,14 +1,35 @@
 import sys
 import argparse
+import hashlib
 import json
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from zipf_analyzer import ZipfAnalyzer
+from zipf_analyzer import ZipfAnalyzer, RANKING_FORMAT
 from tokenizer import Tokenizer
 
 
+def _cache_path(input_path: Path, output_dir: Path, args) -> Path:
+    # The first hash names the input and options, the second its version
+    # and the archive layout, so a changed file or format replaces its old
+    # cache instead of adding one
+    input_key = f"{input_path.resolve()}:{args.mode}:{args.tokenize}"
+    stat = input_path.stat()
+    version_key = f"{RANKING_FORMAT}:{stat.st_mtime}:{stat.st_size}"
+    input_hash = hashlib.sha1(input_key.encode()).hexdigest()[:16]
+    version_hash = hashlib.sha1(version_key.encode()).hexdigest()[:8]
+    return output_dir / f"zipf_cache_{input_hash}_{version_hash}.npz"
+
+
+def _save_cache(analyzer: ZipfAnalyzer, cache_file: Path):
+    analyzer.save_ranking(cache_file)
+    input_hash = cache_file.stem.split('_')[2]
+    for stale in cache_file.parent.glob(f"zipf_cache_{input_hash}_*.npz"):
+        if stale != cache_file:
+            stale.unlink(missing_ok=True)
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Zipf's Law analyzer for text corpus"
@@ -44,11 +65,21 @@ def main():
         default=1000,
         help='Maximum rank for plotting (default: 1000)'
     )
+    parser.add_argument(
+        '--dump-ranks',
+        action='store_true',
+        help='Include the full rank/frequency table in the statistics JSON'
+    )
     parser.add_argument(
         '--no-plot',
         action='store_true',
         help='Do not generate plots'
     )
+    parser.add_argument(
+        '--no-cache',
+        action='store_true',
+        help='Recount frequencies even if a cached ranking exists for the input'
+    )
     
     args = parser.parse_args()
     
@@ -88,7 +119,8 @@ def main():
                 if 'error' not in doc_stat:
                     corpus_tokens[doc_stat['document_id']] = doc_stat['tokens']
         
-        stats = analyzer.analyze_corpus(corpus_tokens, output_dir if not args.no_plot else None)
+        stats = analyzer.analyze_corpus(corpus_tokens, output_dir if not args.no_plot else None,
+                                        include_all_ranks=args.dump_ranks)
         
         print("-" * 80)
         print("ZIPF'S LAW STATISTICS:")
@@ -111,20 +143,26 @@ def main():
         print(f"\nResults saved to: {output_dir}")
         
     elif args.mode == 'tokens':
-        with open(input_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        tokens = data.get('tokens', [])
-        if not tokens:
-            print("Error: No tokens found in input file")
-            return 1
+        cache_file = _cache_path(input_path, output_dir, args)
+        if cache_file.exists() and not args.no_cache:
+            analyzer.load_ranking(cache_file)
+            print(f"Loaded cached frequencies from: {cache_file}")
+        else:
+            with open(input_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            
+            tokens = data.get('tokens', [])
+            if not tokens:
+                print("Error: No tokens found in input file")
+                return 1
+            
+            analyzer.calculate_frequencies(tokens)
+            _save_cache(analyzer, cache_file)
         
-        print(f"Analyzing Zipf's Law for {len(tokens)} tokens")
+        print(f"Analyzing Zipf's Law for {analyzer.total_tokens} tokens")
         print("-" * 80)
         
-        analyzer.calculate_frequencies(tokens)
-        analyzer.get_ranked_frequencies()
-        stats = analyzer.get_statistics()
+        stats = analyzer.get_statistics(include_all_ranks=args.dump_ranks)
         
         print(f"Total tokens: {stats['total_tokens']:,}")
         print(f"Unique tokens: {stats['unique_tokens']:,}")
@@ -148,28 +186,32 @@ def main():
                 print("\nWarning: matplotlib not available, plots not generated")
 
         stats_file = output_dir / 'zipf_statistics.json'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        with open(stats_file, 'w', encoding='utf-8') as f:
-            json.dump(stats, f, ensure_ascii=False, indent=2)
+        analyzer.save_statistics(stats, stats_file)
         print(f"\nStatistics saved to: {stats_file}")
     
     else:
         print(f"Analyzing Zipf's Law for file: {input_path}")
         print("-" * 80)
         
-        with open(input_path, 'r', encoding='utf-8') as f:
-            text = f.read()
-        
-        if args.tokenize:
-            tokenizer = Tokenizer(lowercase=True, min_length=1)
-            tokens = tokenizer.tokenize(text)
-            print(f"Tokenized into {len(tokens)} tokens")
+        cache_file = _cache_path(input_path, output_dir, args)
+        if cache_file.exists() and not args.no_cache:
+            analyzer.load_ranking(cache_file)
+            print(f"Loaded cached frequencies from: {cache_file}")
         else:
-            tokens = text.split()
+            with open(input_path, 'r', encoding='utf-8') as f:
+                text = f.read()
+            
+            if args.tokenize:
+                tokenizer = Tokenizer(lowercase=True, min_length=1)
+                tokens = tokenizer.tokenize(text)
+                print(f"Tokenized into {len(tokens)} tokens")
+            else:
+                tokens = text.split()
+            
+            analyzer.calculate_frequencies(tokens)
+            _save_cache(analyzer, cache_file)
         
-        analyzer.calculate_frequencies(tokens)
-        analyzer.get_ranked_frequencies()
-        stats = analyzer.get_statistics()
+        stats = analyzer.get_statistics(include_all_ranks=args.dump_ranks)
         
         print(f"Total tokens: {stats['total_tokens']:,}")
         print(f"Unique tokens: {stats['unique_tokens']:,}")
@@ -193,9 +235,7 @@ def main():
                 print("\nWarning: matplotlib not available, plots not generated")
 
         stats_file = output_dir / 'zipf_statistics.json'
-        output_dir.mkdir(parents=True, exist_ok=True)
-        with open(stats_file, 'w', encoding='utf-8') as f:
-            json.dump(stats, f, ensure_ascii=False, indent=2)
+        analyzer.save_statistics(stats, stats_file)
         print(f"\nStatistics saved to: {stats_file}")
     
     return 0
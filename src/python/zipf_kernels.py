@@ -0,0 +1,64 @@
+import math
+from typing import Tuple
+
+import numpy as np
+
+try:
+    from numba import njit
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+
+def _zipf_stats_numpy(freqs: np.ndarray, predicted: np.ndarray = None) -> Tuple[float, float]:
+    constant = float(freqs[0])
+    if predicted is None:
+        predicted = constant / np.arange(1, freqs.size + 1, dtype=np.float64)
+    return constant, float(np.corrcoef(freqs, predicted)[0, 1])
+
+
+if HAS_NUMBA:
+    @njit(cache=True)
+    def _zipf_stats_jit(freqs):
+        # Two passes with predicted = C / rank generated on the fly: means
+        # first, then centred sums, which avoid the cancellation of the
+        # one-pass sum-of-squares formula
+        n = freqs.size
+        constant = float(freqs[0])
+        sum_a = 0.0
+        sum_p = 0.0
+        for i in range(n):
+            sum_a += float(freqs[i])
+            sum_p += constant / (i + 1)
+        mean_a = sum_a / n
+        mean_p = sum_p / n
+
+        var_a = 0.0
+        var_p = 0.0
+        cov = 0.0
+        for i in range(n):
+            da = float(freqs[i]) - mean_a
+            dp = constant / (i + 1) - mean_p
+            var_a += da * da
+            var_p += dp * dp
+            cov += da * dp
+
+        denominator = math.sqrt(var_a * var_p)
+        if denominator == 0.0:
+            return constant, 0.0
+        return constant, min(1.0, max(-1.0, cov / denominator))
+
+
+def zipf_stats(freqs: np.ndarray, predicted: np.ndarray = None) -> Tuple[float, float]:
+    if freqs.size == 0:
+        return 0.0, 0.0
+    if freqs.size < 2:
+        return float(freqs[0]), 0.0
+
+    freqs = np.ascontiguousarray(freqs, dtype=np.int64)
+    # Equal frequencies have zero variance; corrcoef would return nan here
+    if freqs.min() == freqs.max():
+        return float(freqs[0]), 0.0
+    if HAS_NUMBA:
+        return _zipf_stats_jit(freqs)
+    return _zipf_stats_numpy(freqs, predicted)
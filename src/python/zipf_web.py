@@ -1,6 +1,5 @@
 from flask import Flask, render_template_string, request, jsonify, send_file
 import json
-import base64
 import io
 from pathlib import Path
 import sys
@@ -12,6 +11,10 @@ from tokenizer import Tokenizer
 
 app = Flask(__name__)
 
+# Tokenizer only reads its config and compiled patterns, so one instance is
+# safe to share between request threads
+TOKENIZER = Tokenizer(lowercase=True, min_length=1)
+
 HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html lang="en">
@@ -141,7 +144,7 @@ HTML_TEMPLATE = """
             margin-top: 20px;
             text-align: center;
         }
-        .plot-container img {
+        .plot-container svg {
             max-width: 100%;
             height: auto;
             border: 1px solid #ddd;
@@ -164,6 +167,14 @@ HTML_TEMPLATE = """
                     <input type="checkbox" id="tokenize" name="tokenize" checked>
                     Tokenize input text first
                 </label>
+                <label>
+                    <input type="checkbox" id="correlation" name="correlation" checked>
+                    Compute correlation with Zipf's Law
+                </label>
+                <label>
+                    <input type="checkbox" id="plots" name="plots" checked>
+                    Generate plots
+                </label>
             </div>
             
             <button type="submit">Analyze Zipf's Law</button>
@@ -193,7 +204,9 @@ HTML_TEMPLATE = """
             const formData = new FormData(form);
             const data = {
                 text: formData.get('inputText'),
-                tokenize: document.getElementById('tokenize').checked
+                tokenize: document.getElementById('tokenize').checked,
+                correlation: document.getElementById('correlation').checked,
+                plots: document.getElementById('plots').checked
             };
             
             try {
@@ -228,7 +241,7 @@ HTML_TEMPLATE = """
                             <div class="stat-label">Zipf Constant (C)</div>
                         </div>
                         <div class="stat-card">
-                            <div class="stat-value">${result.correlation.toFixed(4)}</div>
+                            <div class="stat-value">${result.correlation !== undefined ? result.correlation.toFixed(4) : '&mdash;'}</div>
                             <div class="stat-label">Correlation</div>
                         </div>
                     </div>
@@ -251,16 +264,17 @@ HTML_TEMPLATE = """
                 }
                 
                 // Display plots if available
-                if (result.plot1 && result.plot2) {
+                plotsDiv.innerHTML = '';
+                if (result.plot1_svg && result.plot2_svg) {
                     plotsDiv.innerHTML = `
                         <h4>Visualizations:</h4>
                         <div style="margin-bottom: 20px;">
                             <h5>Zipf's Law (Log-Log Scale)</h5>
-                            <img src="data:image/png;base64,${result.plot1}" alt="Zipf's Law Plot">
+                            ${result.plot1_svg}
                         </div>
                         <div>
                             <h5>Rank vs Frequency (Top 100)</h5>
-                            <img src="data:image/png;base64,${result.plot2}" alt="Rank Frequency Plot">
+                            ${result.plot2_svg}
                         </div>
                     `;
                 }
@@ -287,6 +301,8 @@ def analyze():
         data = request.json
         text = data.get('text', '')
         tokenize = data.get('tokenize', True)
+        include_correlation = data.get('correlation', True)
+        include_plots = data.get('plots', True)
         
         if not text:
             return jsonify({'error': 'No text provided'})
@@ -294,38 +310,33 @@ def analyze():
         analyzer = ZipfAnalyzer()
         
         if tokenize:
-            tokenizer = Tokenizer(lowercase=True, min_length=1)
-            tokens = tokenizer.tokenize(text)
+            tokens = TOKENIZER.tokenize(text)
         else:
             tokens = text.split()
         
         analyzer.calculate_frequencies(tokens)
-        analyzer.get_ranked_frequencies()
-        stats = analyzer.get_statistics()
+        stats = analyzer.get_summary_statistics(include_correlation)
 
-        plot1_base64 = None
-        plot2_base64 = None
+        plot1_svg = None
+        plot2_svg = None
         
-        try:
-            import io
-            import base64
-
-            plot1_path = analyzer.plot_zipf_law(Path('temp_zipf1.png'), max_rank=1000)
-            with open(plot1_path, 'rb') as f:
-                plot1_base64 = base64.b64encode(f.read()).decode('utf-8')
-            Path(plot1_path).unlink()
+        # SVG skips PNG rasterising and deflate, and is inlined without base64
+        if include_plots:
+            try:
+                plot1_buffer = io.BytesIO()
+                analyzer.plot_zipf_law(plot1_buffer, max_rank=1000, fmt='svg')
+                plot1_svg = plot1_buffer.getvalue().decode('utf-8')
 
-            plot2_path = analyzer.plot_rank_frequency(Path('temp_zipf2.png'), max_rank=100)
-            with open(plot2_path, 'rb') as f:
-                plot2_base64 = base64.b64encode(f.read()).decode('utf-8')
-            Path(plot2_path).unlink()
-        except Exception as e:
-            pass
+                plot2_buffer = io.BytesIO()
+                analyzer.plot_rank_frequency(plot2_buffer, max_rank=100, fmt='svg')
+                plot2_svg = plot2_buffer.getvalue().decode('utf-8')
+            except Exception as e:
+                pass
         
         return jsonify({
             **stats,
-            'plot1': plot1_base64,
-            'plot2': plot2_base64
+            'plot1_svg': plot1_svg,
+            'plot2_svg': plot2_svg
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
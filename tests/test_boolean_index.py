@@ -3,18 +3,14 @@ import tempfile
 import shutil
 from pathlib import Path
 import sys
+from unittest import mock
 
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'python'))
+SRC_DIR = str(Path(__file__).parent.parent / 'src' / 'python')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
 
-try:
-    from boolean_index import BooleanIndex
-    from tokenizer import Tokenizer
-except ImportError:
-    import sys
-    from pathlib import Path
-    sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'python'))
-    from boolean_index import BooleanIndex
-    from tokenizer import Tokenizer
+from boolean_index import BooleanIndex, Posting, HAS_MSGPACK
+from tokenizer import Tokenizer
 
 
 class TestBooleanIndex(unittest.TestCase):
@@ -32,6 +28,14 @@ class TestBooleanIndex(unittest.TestCase):
         self.assertIn('dog', self.index.index)
         self.assertIn('bird', self.index.index)
     
+    def test_add_document_stream(self):
+        self.index.add_document_stream(1, (token for token in ['cat', 'dog', 'cat']), {'title': 'First'})
+        self.index.add_document(2, ['cat'])
+        
+        self.assertEqual(self.index.get_documents('cat'), {1, 2})
+        self.assertEqual(self.index.documents[1], {'title': 'First'})
+        self.assertEqual(self.index.stats['index_size'], 3)
+    
     def test_get_documents(self):
         self.index.add_document(1, ['cat', 'dog'])
         self.index.add_document(2, ['cat', 'bird'])
@@ -100,6 +104,125 @@ class TestBooleanIndex(unittest.TestCase):
 
             doc_ids = new_index.get_documents('cat')
             self.assertEqual(doc_ids, {1, 2})
+            self.assertIn(1, new_index.documents)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    def test_postings(self):
+        self.index.add_document(1, ['cat', 'dog'])
+        self.index.add_document(2, ['cat'])
+        
+        postings = self.index.get_postings('cat')
+        self.assertIsInstance(postings, Posting)
+        self.assertEqual(set(postings), {1, 2})
+        self.assertEqual(len(self.index.get_postings('nonexistent')), 0)
+        self.assertEqual(set(self.index.get_all_postings()), {1, 2})
+    
+    def test_posting_array(self):
+        self.index.add_document(3, ['cat', 'dog'])
+        self.index.add_document(1, ['cat'])
+        
+        self.assertEqual(self.index.get_posting_array('cat').tolist(), [1, 3])
+        self.assertEqual(self.index.get_posting_array('nonexistent').tolist(), [])
+        
+        self.index.add_document(2, ['cat', 'bird'])
+        self.assertEqual(self.index.get_posting_array('cat').tolist(), [1, 2, 3])
+        self.assertEqual(self.index.get_all_terms(), ['bird', 'cat', 'dog'])
+        self.assertEqual(self.index.stats['index_size'], 5)
+    
+    def test_add_after_load(self):
+        temp_dir = tempfile.mkdtemp()
+        
+        try:
+            self.index.add_document(1, ['cat'])
+            index_file = Path(temp_dir) / 'test_index.json'
+            self.index.save(index_file)
+            
+            new_index = BooleanIndex()
+            new_index.load(index_file)
+            new_index.add_document(2, ['cat', 'bird'])
+            
+            self.assertEqual(new_index.get_documents('cat'), {1, 2})
+            self.assertEqual(new_index.get_documents('bird'), {2})
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    @unittest.skipUnless(HAS_MSGPACK, 'msgpack is required for .mpk files')
+    def test_save_and_load_msgpack(self):
+        temp_dir = tempfile.mkdtemp()
+        
+        try:
+            self.index.add_document(1, ['cat', 'dog'], {'title': 'First'})
+            self.index.add_document(2, ['cat', 'bird'])
+            
+            index_file = Path(temp_dir) / 'test_index.mpk'
+            self.index.save(index_file)
+            
+            new_index = BooleanIndex()
+            new_index.load(index_file)
+            
+            self.assertEqual(new_index.get_documents('cat'), {1, 2})
+            self.assertEqual(new_index.documents[1], {'title': 'First'})
+            self.assertEqual(new_index.stats, self.index.stats)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    def test_save_and_load_npz(self):
+        temp_dir = tempfile.mkdtemp()
+        
+        try:
+            self.index.add_document(7, ['cat', 'dog'], {'title': 'First'})
+            self.index.add_document(2, ['cat', 'bird'])
+            self.index.add_document(40, ['bird', 'dog', 'fish'])
+            
+            index_file = Path(temp_dir) / 'test_index.npz'
+            self.index.save(index_file)
+            
+            new_index = BooleanIndex()
+            new_index.load(index_file)
+            
+            for term in ('bird', 'cat', 'dog', 'fish'):
+                self.assertEqual(new_index.get_documents(term), self.index.get_documents(term))
+            self.assertEqual(new_index.get_posting_array('dog').tolist(), [7, 40])
+            self.assertEqual(new_index.get_all_terms(), ['bird', 'cat', 'dog', 'fish'])
+            self.assertEqual(new_index.documents[7], {'title': 'First'})
+            self.assertEqual(new_index.stats, self.index.stats)
+            self.assertEqual(new_index.max_doc_id, 40)
+            
+            # The suffix picks the format unless one is given explicitly
+            legacy_file = Path(temp_dir) / 'legacy.idx'
+            self.index.save(legacy_file, format='json')
+            self.assertTrue(legacy_file.read_bytes().startswith(b'{'))
+            
+            empty_file = Path(temp_dir) / 'empty.npz'
+            BooleanIndex().save(empty_file)
+            empty_index = BooleanIndex()
+            empty_index.load(empty_file)
+            self.assertEqual(empty_index.get_all_terms(), [])
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    def test_save_and_load_fast(self):
+        temp_dir = tempfile.mkdtemp()
+        
+        try:
+            self.index.add_document(1, ['cat', 'dog'], {'title': 'First'})
+            self.index.add_document(5, ['cat', 'bird'])
+            
+            index_file = Path(temp_dir) / 'test_index.pkl'
+            self.index.save_fast(index_file)
+            
+            new_index = BooleanIndex()
+            new_index.load_fast(index_file)
+            
+            self.assertIsInstance(new_index.get_postings('cat'), Posting)
+            self.assertEqual(new_index.get_documents('cat'), {1, 5})
+            self.assertEqual(new_index.documents, self.index.documents)
+            self.assertEqual(new_index.stats, self.index.stats)
+            self.assertEqual(new_index.max_doc_id, 5)
+            
+            new_index.add_document(6, ['fish'])
+            self.assertEqual(new_index.get_documents('fish'), {6})
         finally:
             shutil.rmtree(temp_dir, ignore_errors=True)
     
@@ -188,6 +311,61 @@ class TestBooleanIndexIntegration(unittest.TestCase):
             self.assertGreater(index.stats['total_terms'], 0)
         finally:
             shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    def test_build_parallel(self):
+        temp_dir = tempfile.mkdtemp()
+        
+        try:
+            from stemmer import Stemmer
+            
+            corpus_dir = Path(temp_dir) / 'corpus'
+            corpus_dir.mkdir()
+            
+            for i in range(1, 21):
+                (corpus_dir / f'doc_{i:08d}.txt').write_text(
+                    f"TITLE: Doc {i}\nCONTENT:\nTITLE: Doc {i}\ncats and dogs number{i % 3} running",
+                    encoding='utf-8'
+                )
+            (corpus_dir / 'doc_broken.txt').write_text("CONTENT:\nbroken", encoding='utf-8')
+            
+            tokenizer = Tokenizer(lowercase=True, min_length=1)
+            stemmer = Stemmer(language='russian')
+            
+            serial = BooleanIndex()
+            serial_stats = serial.build_from_corpus(corpus_dir, tokenizer, stemmer)
+            
+            parallel = BooleanIndex()
+            with mock.patch('boolean_index.PARALLEL_MIN_DOCUMENTS', 0):
+                parallel_stats = parallel.build_from_corpus(corpus_dir, tokenizer, stemmer, workers=2)
+            
+            self.assertEqual(parallel_stats['documents_processed'], 20)
+            self.assertEqual(parallel_stats['errors'], serial_stats['errors'])
+            self.assertEqual(parallel.get_all_terms(), serial.get_all_terms())
+            self.assertEqual(parallel.get_documents('dogs'), serial.get_documents('dogs'))
+            self.assertEqual(parallel.documents, serial.documents)
+            self.assertEqual(parallel.stats['index_size'], serial.stats['index_size'])
+            
+            # A failing document is counted on the pool path too, not fatal
+            add = BooleanIndex.add_document_stream
+            def flaky_add(index, doc_id, tokens, metadata=None):
+                if doc_id == 3:
+                    raise ValueError('bad document')
+                return add(index, doc_id, tokens, metadata)
+            
+            with mock.patch('boolean_index.PARALLEL_MIN_DOCUMENTS', 0), \
+                 mock.patch.object(BooleanIndex, 'add_document_stream', flaky_add):
+                flaky_stats = BooleanIndex().build_from_corpus(corpus_dir, tokenizer, stemmer, workers=2)
+            self.assertEqual(flaky_stats['documents_processed'], 19)
+            self.assertEqual(flaky_stats['errors'], serial_stats['errors'] + 1)
+            
+            # One core builds serially even past the threshold
+            with mock.patch('boolean_index.PARALLEL_MIN_DOCUMENTS', 0), \
+                 mock.patch('boolean_index.os.cpu_count', return_value=1), \
+                 mock.patch('boolean_index.ProcessPoolExecutor', side_effect=AssertionError):
+                single_stats = BooleanIndex().build_from_corpus(corpus_dir, tokenizer, stemmer)
+            self.assertEqual(single_stats['documents_processed'], 20)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
 
 
 def run_tests():
@@ -0,0 +1,55 @@
+import unittest
+from pathlib import Path
+import sys
+import numpy as np
+
+SRC_DIR = str(Path(__file__).parent.parent / 'src' / 'python')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
+
+from boolean_ops import (intersect_sorted, union_sorted,
+                         _intersect_sorted_numpy, _union_sorted_numpy)
+
+
+class TestBooleanOps(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.pairs = [
+            (np.array([1, 3, 5, 7], dtype=np.uint32), np.array([2, 3, 4, 7, 9], dtype=np.uint32)),
+            (np.array([], dtype=np.uint32), np.array([1, 2], dtype=np.uint32)),
+            # Lengths far enough apart to take the galloping branch
+            (np.array([5, 500, 4999], dtype=np.uint32), np.arange(0, 5000, 5, dtype=np.uint32)),
+            (np.unique(rng.integers(1, 10000, 3000)).astype(np.uint32),
+             np.unique(rng.integers(1, 10000, 2000)).astype(np.uint32)),
+        ]
+
+    def test_intersect_sorted(self):
+        for a, b in self.pairs:
+            expected = sorted(set(a.tolist()) & set(b.tolist()))
+            self.assertEqual(intersect_sorted(a, b).tolist(), expected)
+            self.assertEqual(intersect_sorted(b, a).tolist(), expected)
+            self.assertEqual(_intersect_sorted_numpy(a, b).tolist(), expected)
+
+    def test_union_sorted(self):
+        for a, b in self.pairs:
+            expected = sorted(set(a.tolist()) | set(b.tolist()))
+            self.assertEqual(union_sorted(a, b).tolist(), expected)
+            self.assertEqual(_union_sorted_numpy(a, b).tolist(), expected)
+
+
+def run_tests():
+    loader = unittest.TestLoader()
+    suite = unittest.TestSuite()
+    
+    suite.addTests(loader.loadTestsFromTestCase(TestBooleanOps))
+    
+    runner = unittest.TextTestRunner(verbosity=2)
+    result = runner.run(suite)
+    
+    return result.wasSuccessful()
+
+
+if __name__ == '__main__':
+    success = run_tests()
+    sys.exit(0 if success else 1)
@@ -4,17 +4,12 @@ import shutil
 from pathlib import Path
 import sys
 
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'python'))
+SRC_DIR = str(Path(__file__).parent.parent / 'src' / 'python')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
 
-try:
-    from boolean_search import BooleanSearch, BooleanSearchEngine
-    from boolean_index import BooleanIndex
-except ImportError:
-    import sys
-    from pathlib import Path
-    sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'python'))
-    from boolean_search import BooleanSearch, BooleanSearchEngine
-    from boolean_index import BooleanIndex
+from boolean_search import BooleanSearch, BooleanSearchEngine
+from boolean_index import BooleanIndex
 
 
 class TestBooleanSearch(unittest.TestCase):
@@ -54,6 +49,19 @@ class TestBooleanSearch(unittest.TestCase):
         self.assertEqual(doc_ids, {1, 3})
         self.assertEqual(metadata['result_count'], 2)
     
+    def test_and_ordering(self):
+        tree = self.search_engine._build_query_tree(('cat', 'dog', 'AND', 'bird', 'AND'))
+        self.assertEqual(tree, ('AND', ('TERM', 'cat'), ('TERM', 'dog'), ('TERM', 'bird')))
+        
+        doc_ids, _ = self.search_engine.search('cat AND nonexistent AND dog')
+        self.assertEqual(doc_ids, set())
+        
+        doc_ids, _ = self.search_engine.search('NOT fish AND NOT dog')
+        self.assertEqual(doc_ids, {3})
+        
+        doc_ids, _ = self.search_engine.search('bird AND cat OR fish AND NOT dog')
+        self.assertEqual(doc_ids, {1, 3, 5})
+    
     def test_search_simple(self):
         # AND search
         doc_ids = self.search_engine.search_simple(['cat', 'dog'], 'AND')
@@ -63,6 +71,26 @@ class TestBooleanSearch(unittest.TestCase):
         doc_ids = self.search_engine.search_simple(['cat', 'fish'], 'OR')
         self.assertEqual(doc_ids, {1, 2, 3, 4, 5})
     
+    def test_search_bitsets(self):
+        self.assertTrue(self.index.is_dense())
+        
+        doc_ids = self.search_engine._search_bitsets(['cat', 'dog'], 'AND')
+        self.assertEqual(doc_ids, {1, 2})
+        
+        doc_ids = self.search_engine._search_bitsets(['bird', 'fish'], 'OR')
+        self.assertEqual(doc_ids, {1, 3, 4, 5})
+        
+        self.index.add_document(70, ['cat'])
+        doc_ids = self.search_engine._search_bitsets(['cat', 'nonexistent'], 'OR')
+        self.assertEqual(doc_ids, {1, 2, 3, 70})
+    
+    def test_search_arrays(self):
+        doc_ids = self.search_engine._search_arrays(['cat', 'dog', 'bird'], 'AND')
+        self.assertEqual(doc_ids, {1})
+        
+        doc_ids = self.search_engine._search_arrays(['cat', 'fish', 'nonexistent'], 'OR')
+        self.assertEqual(doc_ids, {1, 2, 3, 4, 5})
+    
     def test_empty_query(self):
         doc_ids, metadata = self.search_engine.search('')
         self.assertEqual(doc_ids, set())
@@ -140,6 +168,20 @@ class TestQueryParsing(unittest.TestCase):
         self.assertEqual(doc_ids1, doc_ids2)
         self.assertEqual(doc_ids1, doc_ids3)
     
+    def test_parse_cache(self):
+        self.search_engine.search('cat AND dog')
+        self.search_engine.search('CAT and DOG')
+        
+        info = self.search_engine._parse_cached.cache_info()
+        self.assertEqual(info.misses, 1)
+        self.assertEqual(info.hits, 1)
+        self.assertEqual(self.search_engine._compiled.cache_info().hits, 1)
+        
+        # Compiled queries read the index when called, so new documents show up
+        self.index.add_document(4, ['cat', 'dog'])
+        doc_ids, _ = self.search_engine.search('cat AND dog')
+        self.assertIn(4, doc_ids)
+    
     def test_operator_precedence(self):
         doc_ids, _ = self.search_engine.search('NOT cat AND dog')
 
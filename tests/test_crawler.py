@@ -3,16 +3,16 @@ import tempfile
 import shutil
 from pathlib import Path
 import sys
+import requests
+from unittest import mock
+from concurrent.futures import ProcessPoolExecutor
 
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'python'))
+SRC_DIR = str(Path(__file__).parent.parent / 'src' / 'python')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
 
-try:
-    from web_crawler import WebCrawler, RobotsTxtParser
-except ImportError:
-    import sys
-    from pathlib import Path
-    sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'python'))
-    from web_crawler import WebCrawler, RobotsTxtParser
+import web_crawler
+from web_crawler import WebCrawler, RobotsTxtParser, VisitedUrls, _parse_page
 
 
 class TestRobotsTxtParser(unittest.TestCase):
@@ -91,6 +91,62 @@ class TestWebCrawler(unittest.TestCase):
         self.assertGreater(len(links), 0)
         self.assertTrue(any('/page1' in link or 'page1' in link for link in links))
     
+    @unittest.skipUnless(web_crawler.HAS_SELECTOLAX, 'selectolax is required for the Lexbor parser')
+    def test_extract_lexbor_matches_beautifulsoup(self):
+        html = """
+        <html>
+            <head><title> Shared Page </title><style>p { color: red; }</style></head>
+            <body>
+                <nav><a href="/menu">Menu</a></nav>
+                <h1>Heading</h1>
+                <span class="post-date">12 March 2024</span>
+                <article><p>Short teaser.</p></article>
+                <article>
+                    <p>The   longer article body,
+                    spread over lines.</p>
+                    <script>var ignored = 1;</script>
+                    <a href="/next?page=2#top">Next</a>
+                    <a href="https://other.example.org/story/">Story</a>
+                    <a href="mailto:test@example.com">Email</a>
+                    <a href="/file.pdf">PDF</a>
+                    <a>No href</a>
+                </article>
+                <time datetime="2024-03-12T10:00:00">March 12</time>
+            </body>
+        </html>
+        """
+        base_url = 'https://example.com/section/'
+        lexbor = (self.crawler._extract_content(html), self.crawler._extract_links(html, base_url))
+        with mock.patch.object(web_crawler, 'HAS_SELECTOLAX', False):
+            soup = (self.crawler._extract_content(html), self.crawler._extract_links(html, base_url))
+        
+        self.assertEqual(lexbor, soup)
+        (title, content, date), links = lexbor
+        self.assertEqual(title, 'Shared Page')
+        self.assertIn('The longer article body, spread over lines.', content)
+        self.assertNotIn('ignored', content)
+        self.assertEqual(date, '2024-03-12T10:00:00')
+        self.assertIn('https://example.com/next', links)
+    
+    def test_parse_page_in_pool(self):
+        html = """
+        <html>
+            <head><title>Pool Page</title></head>
+            <body>
+                <article><p>Parsed in a worker process.</p></article>
+                <a href="/next">Next</a>
+            </body>
+        </html>
+        """
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            title, content, date, links = pool.submit(
+                _parse_page, html, 'https://example.com', True
+            ).result()
+        
+        self.assertEqual(title, 'Pool Page')
+        self.assertIn('worker process', content)
+        self.assertEqual(links, ['https://example.com/next'])
+    
     def test_save_document(self):
         doc_id = 1
         url = 'https://example.com/test'
@@ -112,6 +168,19 @@ class TestWebCrawler(unittest.TestCase):
             self.assertIn(title, text_content)
             self.assertIn(content, text_content)
     
+    def test_detect_encoding(self):
+        response = requests.Response()
+        response.headers['Content-Type'] = 'text/html; charset=windows-1251'
+        response.encoding = 'windows-1251'
+        response._content = b'<html></html>'
+        self.assertEqual(self.crawler._detect_encoding(response), 'windows-1251')
+
+        response = requests.Response()
+        response.headers['Content-Type'] = 'text/html'
+        response.encoding = 'ISO-8859-1'
+        response._content = b'<html><head><meta charset="utf-8"></head></html>'
+        self.assertEqual(self.crawler._detect_encoding(response), 'utf-8')
+
     def test_state_save_load(self):
         self.crawler.last_doc_id = 5
         self.crawler.visited_urls.add('https://example.com/test')
@@ -121,6 +190,54 @@ class TestWebCrawler(unittest.TestCase):
         self.assertEqual(new_crawler.last_doc_id, 5)
         self.assertIn('https://example.com/test', new_crawler.visited_urls)
 
+    def test_visited_urls(self):
+        for use_bloom in (False, True):
+            visited = VisitedUrls(initial_capacity=1000, recent_size=2, use_bloom=use_bloom)
+            for i in range(5):
+                visited.add(f'https://example.com/page{i}')
+
+            self.assertEqual(len(visited), 5)
+            self.assertEqual(len(visited.recent), 2)
+            self.assertIn('https://example.com/page0', visited)
+            self.assertNotIn('https://example.com/other', visited)
+
+    def test_visited_urls_save_load(self):
+        for use_bloom in (False, True):
+            visited = VisitedUrls(initial_capacity=1000, use_bloom=use_bloom)
+            visited.update(['https://example.com/a', 'https://example.com/b'])
+            path = Path(self.temp_dir) / f'visited_{use_bloom}'
+            visited.save(path)
+
+            loaded = VisitedUrls(initial_capacity=1000, use_bloom=use_bloom)
+            loaded.load(path)
+
+            self.assertEqual(len(loaded), 2)
+            self.assertIn('https://example.com/a', loaded)
+            self.assertNotIn('https://example.com/c', loaded)
+    
+    @unittest.skipUnless(web_crawler.HAS_BLOOM, 'pybloom_live is required for the Bloom filter')
+    def test_visited_urls_backend_change(self):
+        url = 'https://example.com/test'
+        with mock.patch.object(web_crawler, 'HAS_BLOOM', False):
+            crawler = WebCrawler(output_dir=self.temp_dir)
+            crawler.visited_urls.add(url)
+            crawler._save_state()
+        
+        # A set saved before pybloom_live was installed seeds the filter
+        crawler = WebCrawler(output_dir=self.temp_dir)
+        self.assertTrue(crawler.visited_urls.use_bloom)
+        self.assertIn(url, crawler.visited_urls)
+        crawler._save_state()
+        self.assertTrue(crawler.visited_file.exists())
+        self.assertFalse(crawler.visited_set_file.exists())
+        
+        # A filter cannot become a set again, which is logged
+        with mock.patch.object(web_crawler, 'HAS_BLOOM', False), \
+             self.assertLogs(level='WARNING') as logs:
+            crawler = WebCrawler(output_dir=self.temp_dir)
+        self.assertNotIn(url, crawler.visited_urls)
+        self.assertIn('pybloom_live is not installed', logs.output[0])
+
 
 class TestCrawlerIntegration(unittest.TestCase):
     
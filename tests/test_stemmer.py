@@ -2,17 +2,12 @@ import unittest
 from pathlib import Path
 import sys
 
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'python'))
+SRC_DIR = str(Path(__file__).parent.parent / 'src' / 'python')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
 
-try:
-    from stemmer import Stemmer, RussianStemmer
-    from tokenizer import Tokenizer
-except ImportError:
-    import sys
-    from pathlib import Path
-    sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'python'))
-    from stemmer import Stemmer, RussianStemmer
-    from tokenizer import Tokenizer
+from stemmer import Stemmer, RussianStemmer
+from tokenizer import Tokenizer
 
 
 class TestRussianStemmer(unittest.TestCase):
@@ -97,6 +92,14 @@ class TestRussianStemmer(unittest.TestCase):
         
         self.assertIsInstance(frequencies, dict)
         self.assertGreater(len(frequencies), 0)
+    
+    def test_stem_cache(self):
+        word = self.stemmer.stem_tokens(['котом'])[0]
+        self.assertEqual(self.stemmer.stem('котом'), word)
+        self.assertGreaterEqual(self.stemmer._stem_cached.cache_info().hits, 1)
+        
+        self.stemmer.clear_cache()
+        self.assertEqual(self.stemmer._stem_cached.cache_info().currsize, 0)
 
 
 class TestStemmer(unittest.TestCase):
@@ -3,22 +3,23 @@ import tempfile
 import shutil
 from pathlib import Path
 import sys
+import sqlite3
+from contextlib import closing
+from unittest import mock
 
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'python'))
+SRC_DIR = str(Path(__file__).parent.parent / 'src' / 'python')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
 
-try:
-    from tokenizer import Tokenizer
-except ImportError:
-    import sys
-    from pathlib import Path
-    sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'python'))
-    from tokenizer import Tokenizer
+from tokenizer import Tokenizer, TOKEN_CACHE_FILE, TOKENIZER_VERSION, _TOKEN_RE, clear_token_cache
 
 
 class TestTokenizer(unittest.TestCase):
     
-    def setUp(self):
-        self.tokenizer = Tokenizer()
+    @classmethod
+    def setUpClass(cls):
+        # Tokenizer holds only its settings, so one instance serves every test
+        cls.tokenizer = Tokenizer()
     
     def test_basic_tokenization(self):
         text = "Hello world! This is a test."
@@ -64,6 +65,9 @@ class TestTokenizer(unittest.TestCase):
         self.assertNotIn('and', tokens)
         self.assertIn('cat', tokens)
         self.assertIn('dog', tokens)
+        
+        tokens = tokenizer.tokenize("Это книга для всех, если она есть")
+        self.assertEqual(tokens, ['книга'])
     
     def test_numbers(self):
         text = "The year is 2025 and the price is 100 dollars"
@@ -86,6 +90,31 @@ class TestTokenizer(unittest.TestCase):
         self.assertIn('this', tokens)
         self.assertIn('теѝт', tokens)
     
+    def test_tokens_interned(self):
+        tokens = self.tokenizer.tokenize("Cat dog cat")
+        self.assertIs(tokens[0], tokens[2])
+    
+    def test_iter_tokens(self):
+        text = "The Cat, a dog and 42 birds! A b c"
+        for kwargs in ({}, {'lowercase': False}, {'min_length': 2},
+                       {'remove_stopwords': True}, {'remove_punctuation': True, 'min_length': 3}):
+            tokenizer = Tokenizer(**kwargs)
+            self.assertEqual(list(tokenizer.iter_tokens(text)), tokenizer.tokenize(text))
+        self.assertEqual(list(self.tokenizer.iter_tokens('')), [])
+    
+    def test_unicode_letters(self):
+        tokens = self.tokenizer.tokenize('Мир, Азбука и Ёж 42x')
+        self.assertEqual(tokens, ['мир', 'азбука', 'и', 'ёж', '42', 'x'])
+        
+        tokens = Tokenizer(lowercase=False).tokenize('Мир Ёж')
+        self.assertEqual(tokens, ['Мир', 'Ёж'])
+    
+    def test_ascii_fast_path(self):
+        for text in ("Hello, world! It's 2024 - (test) x_y", "abc123 def", "a1b2 c",
+                     "tab\tand\nnewline", "Mixed Привет 42 world"):
+            self.assertEqual(self.tokenizer._find_words(text), _TOKEN_RE.findall(text.lower()))
+            self.assertEqual(Tokenizer(lowercase=False)._find_words(text), _TOKEN_RE.findall(text))
+    
     def test_empty_text(self):
         tokens = self.tokenizer.tokenize("")
         self.assertEqual(len(tokens), 0)
@@ -130,6 +159,13 @@ class TestTokenizer(unittest.TestCase):
             self.assertGreater(result['unique_tokens'], 0)
             self.assertIn('tokens', result)
             self.assertIn('frequencies', result)
+            
+            counts_only = self.tokenizer.tokenize_document(doc_file, return_tokens=False)
+            self.assertNotIn('tokens', counts_only)
+            self.assertEqual(counts_only['frequencies'], result['frequencies'])
+            self.assertEqual(counts_only['total_tokens'], result['total_tokens'])
+            
+            self.assertEqual(list(self.tokenizer.tokenize_stream(doc_file)), result['tokens'])
         finally:
             shutil.rmtree(temp_dir, ignore_errors=True)
     
@@ -161,6 +197,90 @@ class TestTokenizer(unittest.TestCase):
             self.assertTrue(stats_file.exists())
         finally:
             shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    def test_corpus_token_cache(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            corpus_dir = Path(temp_dir) / "corpus"
+            output_dir = Path(temp_dir) / "output"
+            corpus_dir.mkdir()
+            for i in range(3):
+                (corpus_dir / f"doc_{i:08d}.txt").write_text(
+                    f"TITLE: Doc {i}\nCONTENT:\ncached document {i}", encoding='utf-8'
+                )
+            
+            def cached_rows():
+                with closing(sqlite3.connect(str(output_dir / TOKEN_CACHE_FILE))) as db:
+                    return db.execute('SELECT version, COUNT(*) FROM documents GROUP BY version').fetchall()
+            
+            self.tokenizer.tokenize_corpus(corpus_dir, output_dir)
+            self.assertFalse((output_dir / TOKEN_CACHE_FILE).exists())
+            
+            first = self.tokenizer.tokenize_corpus(corpus_dir, output_dir, use_cache=True)
+            self.assertTrue((output_dir / TOKEN_CACHE_FILE).exists())
+            
+            with mock.patch.object(Tokenizer, 'tokenize_document', side_effect=AssertionError):
+                second = self.tokenizer.tokenize_corpus(corpus_dir, output_dir, use_cache=True)
+            self.assertEqual(second['corpus_frequencies'], first['corpus_frequencies'])
+            self.assertEqual(second['document_stats'], first['document_stats'])
+            
+            (corpus_dir / "doc_00000001.txt").write_text("CONTENT:\nchanged text", encoding='utf-8')
+            third = self.tokenizer.tokenize_corpus(corpus_dir, output_dir, use_cache=True)
+            self.assertEqual(third['document_stats'][1]['tokens'], ['changed', 'text'])
+            self.assertEqual(third['document_stats'][0], first['document_stats'][0])
+            # The edited document's entry was replaced, not added to
+            self.assertEqual(cached_rows(), [(TOKENIZER_VERSION, 3)])
+            
+            # Other settings must not be served this tokenizer's entries
+            long_only = Tokenizer(min_length=7).tokenize_corpus(corpus_dir, output_dir, use_cache=True)
+            self.assertEqual(long_only['document_stats'][0]['tokens'], ['document'])
+            
+            # Nor entries written by an older tokenizer version
+            with mock.patch('tokenizer.TOKENIZER_VERSION', -1), \
+                 mock.patch.object(Tokenizer, 'tokenize_document', wraps=self.tokenizer.tokenize_document) as tokenize:
+                self.tokenizer.tokenize_corpus(corpus_dir, output_dir, use_cache=True)
+            self.assertEqual(tokenize.call_count, 3)
+            # Opening under another version deletes every older entry
+            self.assertEqual(cached_rows(), [(-1, 3)])
+            
+            self.tokenizer.tokenize_corpus(corpus_dir, output_dir, use_cache=True)
+            clear_token_cache(output_dir)
+            self.assertEqual(cached_rows(), [])
+            with mock.patch.object(Tokenizer, 'tokenize_document', wraps=self.tokenizer.tokenize_document) as tokenize:
+                self.tokenizer.tokenize_corpus(corpus_dir, output_dir, use_cache=True)
+            self.assertEqual(tokenize.call_count, 3)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    
+    def test_corpus_tokenization_parallel(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            corpus_dir = Path(temp_dir)
+            for i in range(20):
+                (corpus_dir / f"doc_{i:08d}.txt").write_text(
+                    f"TITLE: Doc {i}\nCONTENT:\nparallel document {i} " + "word " * i,
+                    encoding='utf-8'
+                )
+            
+            serial = self.tokenizer.tokenize_corpus(corpus_dir)
+            with mock.patch('tokenizer.PARALLEL_MIN_DOCUMENTS', 0):
+                parallel = self.tokenizer.tokenize_corpus(corpus_dir, processes=2)
+            
+            self.assertEqual(parallel['corpus_frequencies'], serial['corpus_frequencies'])
+            self.assertEqual(parallel['total_tokens'], serial['total_tokens'])
+            self.assertEqual(
+                [doc['document_id'] for doc in parallel['document_stats']],
+                [doc['document_id'] for doc in serial['document_stats']]
+            )
+            
+            with mock.patch('tokenizer.PARALLEL_MIN_DOCUMENTS', 0):
+                counts_only = self.tokenizer.tokenize_corpus(corpus_dir, processes=2, return_tokens=False)
+            
+            self.assertEqual(counts_only['corpus_frequencies'], serial['corpus_frequencies'])
+            self.assertEqual(counts_only['total_tokens'], serial['total_tokens'])
+            self.assertNotIn('tokens', counts_only['document_stats'][0])
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
 
 
 def run_tests():
@@ -3,24 +3,28 @@ import tempfile
 import shutil
 from pathlib import Path
 import sys
+import io
+from unittest import mock
+import numpy as np
 
-sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'python'))
+SRC_DIR = str(Path(__file__).parent.parent / 'src' / 'python')
+if SRC_DIR not in sys.path:
+    sys.path.insert(0, SRC_DIR)
 
-try:
-    from zipf_analyzer import ZipfAnalyzer
-    from tokenizer import Tokenizer
-except ImportError:
-    import sys
-    from pathlib import Path
-    sys.path.insert(0, str(Path(__file__).parent.parent / 'src' / 'python'))
-    from zipf_analyzer import ZipfAnalyzer
-    from tokenizer import Tokenizer
+from zipf_analyzer import ZipfAnalyzer, HAS_MATPLOTLIB
+import zipf_kernels
+from zipf_kernels import zipf_stats
+from tokenizer import Tokenizer
 
 
 class TestZipfAnalyzer(unittest.TestCase):
     
+    @classmethod
+    def setUpClass(cls):
+        cls.analyzer = ZipfAnalyzer()
+    
     def setUp(self):
-        self.analyzer = ZipfAnalyzer()
+        self.analyzer.reset()
     
     def test_calculate_frequencies(self):
         tokens = ['cat', 'dog', 'cat', 'bird', 'cat', 'dog']
@@ -42,6 +46,10 @@ class TestZipfAnalyzer(unittest.TestCase):
         self.assertEqual(ranked[0][1], 'cat')
         self.assertEqual(ranked[0][0], 1)
         self.assertEqual(ranked[0][2], 3)
+        self.assertIs(self.analyzer.get_ranked_frequencies(), ranked)
+        
+        self.analyzer.calculate_frequencies(['dog', 'dog'])
+        self.assertEqual(self.analyzer.get_ranked_frequencies(), [(1, 'dog', 2, 1.0)])
     
     def test_calculate_zipf_constant(self):
         tokens = ['cat', 'dog', 'cat', 'bird', 'cat', 'dog']
@@ -63,6 +71,10 @@ class TestZipfAnalyzer(unittest.TestCase):
 
         predicted2 = self.analyzer.calculate_zipf_predicted(2, constant)
         self.assertEqual(predicted2, constant / 2)
+
+        predicted_array = self.analyzer.calculate_zipf_predicted(np.array([1, 2, 0]))
+        self.assertEqual(predicted_array.tolist(), [constant, constant / 2, 0.0])
+        self.assertEqual(self.analyzer.zipf_predicted_array(2).tolist(), [constant, constant / 2])
     
     def test_calculate_correlation(self):
 
@@ -87,11 +99,95 @@ class TestZipfAnalyzer(unittest.TestCase):
         self.assertIn('zipf_constant', stats)
         self.assertIn('correlation', stats)
         self.assertIn('top_words', stats)
-        self.assertIn('ranked_frequencies', stats)
+        self.assertNotIn('ranked_frequencies', stats)
         
         self.assertEqual(stats['total_tokens'], 6)
         self.assertEqual(stats['unique_tokens'], 3)
         self.assertEqual(len(stats['top_words']), 3)  # All 3 words
+        
+        stats = self.analyzer.get_statistics(include_all_ranks=True)
+        self.assertIn('ranked_frequencies', stats)
+        self.assertEqual(len(stats['ranked_frequencies']), 3)
+        self.assertIs(stats['top_words'][0], stats['ranked_frequencies'][0])
+    
+    def test_get_summary_statistics(self):
+        tokens = ['cat', 'dog', 'cat', 'bird', 'cat', 'dog']
+        self.analyzer.calculate_frequencies(tokens)
+        
+        summary = self.analyzer.get_summary_statistics()
+        
+        self.assertNotIn('correlation', summary)
+        self.assertFalse(self.analyzer._ranked)
+        self.assertEqual(summary['zipf_constant'], 3)
+        
+        full = self.analyzer.get_full_statistics()
+        self.assertEqual(summary['top_words'], full['top_words'])
+        self.assertEqual(
+            self.analyzer.get_summary_statistics(include_correlation=True)['correlation'],
+            full['correlation']
+        )
+    
+    def test_calculate_frequencies_from_docs(self):
+        docs = [['cat', 'dog'], ['cat', 'bird', 'cat'], []]
+        frequencies = self.analyzer.calculate_frequencies_from_docs(docs)
+        
+        self.assertEqual(frequencies, {'cat': 3, 'dog': 1, 'bird': 1})
+        self.assertEqual(self.analyzer.total_tokens, 5)
+        self.assertEqual(self.analyzer.unique_tokens, 3)
+    
+    @unittest.skipUnless(HAS_MATPLOTLIB, 'matplotlib is required for plotting')
+    def test_plot_to_buffer(self):
+        self.analyzer.calculate_frequencies(['cat', 'dog', 'cat', 'bird', 'cat', 'dog'])
+        
+        buffer = io.BytesIO()
+        result = self.analyzer.plot_zipf_law(buffer)
+        
+        self.assertIsNone(result)
+        self.assertTrue(buffer.getvalue().startswith(b'\x89PNG'))
+        
+        buffer = io.BytesIO()
+        self.analyzer.plot_rank_frequency(buffer, fmt='svg')
+        self.assertIn(b'<svg', buffer.getvalue())
+
+    def test_save_load_ranking(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            self.analyzer.calculate_frequencies(['cat', 'dog', 'cat', 'bird', 'cat', 'dog'])
+            expected = self.analyzer.get_statistics()
+            cache_file = Path(temp_dir) / 'ranking.npz'
+            self.analyzer.save_ranking(cache_file)
+
+            loaded = ZipfAnalyzer()
+            loaded.load_ranking(cache_file)
+
+            self.assertEqual(loaded.tokens, ['cat', 'dog', 'bird'])
+            self.assertEqual(loaded.get_statistics(), expected)
+            
+            self.analyzer.calculate_frequencies(['x' * 1000, 'word', 'word'])
+            self.analyzer.save_ranking(cache_file)
+            loaded.load_ranking(cache_file)
+            self.assertEqual(loaded.tokens, ['word', 'x' * 1000])
+            
+            self.analyzer.calculate_frequencies(['a\0b', 'a', 'a', 'b', ''])
+            self.analyzer.save_ranking(cache_file)
+            loaded.load_ranking(cache_file)
+            self.assertEqual(loaded.tokens, ['a', 'a\0b', 'b', ''])
+            self.assertEqual(dict(loaded.frequencies), dict(self.analyzer.frequencies))
+            
+            ZipfAnalyzer().save_ranking(cache_file)
+            loaded.load_ranking(cache_file)
+            self.assertEqual(loaded.tokens, [])
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+
+    def test_reset(self):
+        self.analyzer.calculate_frequencies(['cat', 'dog', 'cat'])
+        self.analyzer.get_ranked_frequencies()
+        self.analyzer.reset()
+        
+        self.assertEqual(self.analyzer.total_tokens, 0)
+        self.assertEqual(self.analyzer.get_ranked_frequencies(), [])
+        self.assertEqual(self.analyzer.calculate_zipf_constant(), 0.0)
     
     def test_empty_tokens(self):
         frequencies = self.analyzer.calculate_frequencies([])
@@ -168,6 +264,39 @@ class TestZipfLawValidation(unittest.TestCase):
         correlation = analyzer.calculate_correlation()
         self.assertGreater(correlation, 0.5)
     
+    def test_zipf_stats_kernel(self):
+        freqs = np.array([100, 50, 33, 25, 20, 10, 5, 1], dtype=np.int64)
+        predicted = 100 / np.arange(1, freqs.size + 1)
+        
+        constant, correlation = zipf_stats(freqs)
+        
+        self.assertEqual(constant, 100.0)
+        self.assertAlmostEqual(correlation, np.corrcoef(freqs, predicted)[0, 1], places=9)
+        self.assertEqual(zipf_stats(np.array([], dtype=np.int64)), (0.0, 0.0))
+    
+    def test_zipf_stats_equal_frequencies(self):
+        freqs = np.full(5, 7, dtype=np.int64)
+        
+        with mock.patch.object(zipf_kernels, 'HAS_NUMBA', False):
+            self.assertEqual(zipf_stats(freqs), (7.0, 0.0))
+        self.assertEqual(zipf_stats(freqs), (7.0, 0.0))
+        
+        analyzer = ZipfAnalyzer()
+        analyzer.calculate_frequencies(['a', 'b', 'c'])
+        self.assertEqual(analyzer.calculate_correlation(), 0.0)
+    
+    @unittest.skipUnless(zipf_kernels.HAS_NUMBA, 'numba is required for the JIT kernel')
+    def test_zipf_stats_jit_matches_numpy(self):
+        rng = np.random.default_rng(0)
+        freqs = np.sort(rng.integers(10**9, 10**9 + 1000, size=200000))[::-1].astype(np.int64)
+        freqs[0] = 3 * 10**9
+        
+        jit_constant, jit_correlation = zipf_kernels._zipf_stats_jit(freqs)
+        constant, correlation = zipf_kernels._zipf_stats_numpy(freqs)
+        
+        self.assertEqual(jit_constant, constant)
+        self.assertAlmostEqual(jit_correlation, correlation, delta=1e-12)
+    
     def test_rank_order(self):
         tokens = ['a'] * 10 + ['b'] * 5 + ['c'] * 3 + ['d'] * 2
         analyzer = ZipfAnalyzer()